@@ -22,6 +22,7 @@ from __future__ import annotations
 
 import argparse
 import sys
+from functools import lru_cache
 
 from dotenv import load_dotenv
 
@@ -30,16 +31,16 @@ load_dotenv()
 from rich.console import Console
 from rich.panel import Panel
 
-from src.agents.analyst_agent import create_analyst_agent
-from src.agents.reviewer_agent import create_reviewer_agent
-from src.agents.team import create_stf_team
-from src.graph.neo4j_client import Neo4jClient
+# Agno, OpenAI e o driver Neo4j são importados só dentro das funções que os
+# usam: `--help` e `--quality-report` não pagam esse custo de startup.
 
 console = Console()
 
 
 def check_neo4j() -> bool:
     """Verifica conexão com Neo4j e se há dados."""
+    from src.graph.neo4j_client import Neo4jClient
+
     try:
         with Neo4jClient() as client:
             if not client.verify_connection():
@@ -60,33 +61,41 @@ def check_neo4j() -> bool:
         return False
 
 
-def run_interactive(use_team: bool = True) -> None:
+@lru_cache(maxsize=None)
+def _welcome_panel(title: str) -> Panel:
+    """Monta (uma vez por título) o painel de boas-vindas do modo interativo."""
+    return Panel(
+        f"[bold cyan]{title}[/bold cyan]\n\n"
+        "Faça perguntas sobre as 4 decisões do STF mapeadas no Knowledge Graph.\n"
+        "Digite [bold]'sair'[/bold] ou [bold]'exit'[/bold] para encerrar.\n\n"
+        "[dim]Exemplos de perguntas:[/dim]\n"
+        "  • Resuma a decisão HC 161.450\n"
+        "  • Quais decisões citam o art. 5º da CF?\n"
+        "  • Quais conexões existem entre as decisões sobre direitos fundamentais?\n"
+        "  • Que processos citam o mesmo precedente?",
+        title="[bold]Sistema Neuro-Simbólico de Análise Jurídica[/bold]",
+        border_style="cyan",
+    )
+
+
+def run_interactive(use_team: bool = True, use_cache: bool = True) -> None:
     """Modo interativo de chat."""
+    from src.agents.analyst_agent import create_analyst_agent
+    from src.agents.team import create_stf_team
+
     if use_team:
-        agent = create_stf_team()
+        agent = create_stf_team(use_cache=use_cache)
         title = "Equipe de Análise STF (Analista + Revisor)"
     else:
         agent = create_analyst_agent()
         title = "Agente Analista STF"
 
-    console.print(
-        Panel(
-            f"[bold cyan]{title}[/bold cyan]\n\n"
-            "Faça perguntas sobre as 4 decisões do STF mapeadas no Knowledge Graph.\n"
-            "Digite [bold]'sair'[/bold] ou [bold]'exit'[/bold] para encerrar.\n\n"
-            "[dim]Exemplos de perguntas:[/dim]\n"
-            "  • Resuma a decisão HC 161.450\n"
-            "  • Quais decisões citam o art. 5º da CF?\n"
-            "  • Quais conexões existem entre as decisões sobre direitos fundamentais?\n"
-            "  • Que processos citam o mesmo precedente?",
-            title="[bold]Sistema Neuro-Simbólico de Análise Jurídica[/bold]",
-            border_style="cyan",
-        )
-    )
+    console.print(_welcome_panel(title))
 
     while True:
         try:
-            query = console.input("\n[bold green]Você:[/bold green] ").strip()
+            # input() puro: o prompt não passa pelo pipeline de render do Rich
+            query = input("\nVocê: ").strip()
         except (KeyboardInterrupt, EOFError):
             break
 
@@ -109,10 +118,13 @@ def run_interactive(use_team: bool = True) -> None:
     console.print("\n[dim]Encerrando...[/dim]")
 
 
-def run_single_query(query: str, use_team: bool = True) -> None:
+def run_single_query(query: str, use_team: bool = True, use_cache: bool = True) -> None:
     """Executa uma pergunta única."""
+    from src.agents.analyst_agent import create_analyst_agent
+    from src.agents.team import create_stf_team
+
     if use_team:
-        agent = create_stf_team()
+        agent = create_stf_team(use_cache=use_cache)
     else:
         agent = create_analyst_agent()
 
@@ -131,6 +143,8 @@ def run_single_query(query: str, use_team: bool = True) -> None:
 
 def run_review(text: str) -> None:
     """Executa revisão de um texto com o Agente Revisor."""
+    from src.agents.reviewer_agent import create_reviewer_agent
+
     reviewer = create_reviewer_agent()
 
     prompt = (
@@ -175,6 +189,11 @@ def main() -> None:
         action="store_true",
         help="Pular verificação de conexão com Neo4j",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignora o cache de respostas e executa o pipeline completo",
+    )
     parser.add_argument(
         "--quality-report",
         action="store_true",
@@ -194,12 +213,20 @@ def main() -> None:
         print_quality_report()
         return
 
+    if not args.skip_check:
+        from src.tools.graph_tools import warmup_plan_cache
+        warmup_plan_cache()
+
     if args.review:
         run_review(args.review)
     elif args.query:
-        run_single_query(args.query, use_team=not args.analyst_only)
+        run_single_query(
+            args.query,
+            use_team=not args.analyst_only,
+            use_cache=not args.no_cache,
+        )
     else:
-        run_interactive(use_team=not args.analyst_only)
+        run_interactive(use_team=not args.analyst_only, use_cache=not args.no_cache)
 
 
 if __name__ == "__main__":
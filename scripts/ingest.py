@@ -3,6 +3,9 @@ Pipeline de ingestão: PDF → Docling Extraction → Neo4j Knowledge Graph.
 
 Uso:
   python -m scripts.ingest --pdf-dir data/decisions
+
+  # Atualiza índices e propriedades de um grafo já ingerido, sem reingerir:
+  python -m scripts.ingest --migrate
 """
 
 from __future__ import annotations
@@ -15,15 +18,54 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from src.graph.neo4j_client import Neo4jClient
-from src.graph.schema import create_schema, ingest_all
-
+from rich.console import Console
+from rich.markup import escape
+from rich.progress import Progress
+from rich.table import Table
 
-def ingest_from_pdfs(client: Neo4jClient, pdf_dir: str) -> None:
+from src.agents.response_cache import clear_response_cache
+from src.graph.neo4j_client import Neo4jClient
+from src.graph.schema import await_indexes, create_schema, ingest_all, migrate_data
+from src.tools.graph_tools import invalidate_graph_cache
+
+console = Console()
+
+
+_TABLE_COLUMNS = [
+    ("arquivo", "Arquivo"),
+    ("texto", "Texto"),
+    ("voto", "Voto"),
+    ("dispositivo", "Dispositivo"),
+    ("processo", "Processo"),
+    ("classe", "Classe"),
+    ("relator", "Relator"),
+    ("temas", "Temas"),
+    ("artigos", "Artigos"),
+    ("precedentes", "Precedentes"),
+]
+
+
+def _print_extraction_table(rows: list[dict]) -> None:
+    """Imprime, de uma vez, o resumo por documento da extração."""
+    table = Table(title="Metadados extraídos")
+    for _, header in _TABLE_COLUMNS:
+        table.add_column(header)
+    for row in rows:
+        table.add_row(*(escape(str(row.get(key, ""))) for key, _ in _TABLE_COLUMNS))
+    console.print(table)
+
+
+def ingest_from_pdfs(
+    client: Neo4jClient,
+    pdf_dir: str,
+    max_workers: int | None = None,
+    llm_workers: int = 8,
+    use_batch_api: bool = False,
+) -> None:
     """Extrai PDFs com Docling e usa LLM para identificar metadados estruturados."""
     from src.extraction.docling_extractor import extract_all_from_directory
-    from src.extraction.llm_metadata_extractor import extract_metadata_from_text
-    from src.models.schemas import DecisaoSTF
+    from src.extraction.llm_metadata_extractor import extract_many
+    from src.models.schemas import DecisaoSTF, ExtractionResult
 
     pdf_path = Path(pdf_dir)
     if not pdf_path.is_dir():
@@ -31,41 +73,93 @@ def ingest_from_pdfs(client: Neo4jClient, pdf_dir: str) -> None:
         sys.exit(1)
 
     print(f"\n[1/5] Extraindo texto dos PDFs de {pdf_dir} com Docling...")
-    extractions = extract_all_from_directory(pdf_path)
+    # PDFs que o Docling não conseguiu ler entram na tabela final como ERRO
+    failed: list[dict] = []
+    with Progress(console=console, transient=True) as progress:
+        task = progress.add_task("  Docling", total=len(list(pdf_path.glob("*.pdf"))))
+
+        def on_extracted(pdf: Path, result: ExtractionResult | Exception) -> None:
+            progress.advance(task)
+            if isinstance(result, Exception):
+                progress.console.print(
+                    f"  [ERRO] {pdf.name}: falha na extração com Docling: {result}",
+                    markup=False,
+                )
+                failed.append({"arquivo": pdf.name, "texto": "ERRO"})
+
+        extractions = extract_all_from_directory(
+            pdf_path, max_workers=max_workers, on_result=on_extracted
+        )
     print(f"  {len(extractions)} PDFs processados pelo Docling.")
 
-    print("[2/5] Criando schema no Neo4j...")
+    print("[2/5] Extraindo metadados estruturados via LLM (OpenAI)...")
+    # Chamadas concorrentes (limitadas por semáforo e por OPENAI_MAX_RPM);
+    # a ordem original é mantida na ingestão.
+    stats: list[dict] = [
+        {
+            "arquivo": ext.arquivo,
+            "texto": len(ext.texto_completo),
+            "voto": len(ext.voto),
+            "dispositivo": len(ext.dispositivo),
+        }
+        for ext in extractions
+    ]
+
+    def record(i: int, result: DecisaoSTF | Exception, out: Console) -> None:
+        if isinstance(result, Exception):
+            out.print(
+                f"  [ERRO] {extractions[i].arquivo}: falha na extração de metadados: {result}",
+                markup=False,
+            )
+            stats[i]["processo"] = "ERRO"
+            return
+        stats[i].update(
+            processo=result.numero_processo,
+            classe=result.classe,
+            relator=result.ministro_relator.nome,
+            temas=len(result.temas),
+            artigos=len(result.artigos_citados),
+            precedentes=len(result.precedentes_citados),
+        )
+
+    if use_batch_api:
+        from src.extraction.llm_batch import extract_metadata_batch
+
+        print("  Enviando requisições pela Batch API (pode levar até 24h)...")
+        results = extract_metadata_batch(extractions)
+        for i, result in enumerate(results):
+            record(i, result, console)
+    else:
+        with Progress(console=console, transient=True) as progress:
+            task = progress.add_task("  Metadados via LLM", total=len(extractions))
+
+            def on_result(i: int, result: DecisaoSTF | Exception) -> None:
+                progress.advance(task)
+                record(i, result, progress.console)
+
+            results = extract_many(extractions, concurrency=llm_workers, on_result=on_result)
+
+    decisions = [r for r in results if isinstance(r, DecisaoSTF)]
+    _print_extraction_table(stats + failed)
+
+    # O grafo só é limpo depois que toda a extração terminou, para não ficar
+    # vazio durante as chamadas ao LLM (que, na Batch API, levam horas).
+    print("[3/5] Criando schema no Neo4j...")
     create_schema(client)
 
-    print("[3/5] Limpando dados anteriores...")
+    print("[4/5] Limpando dados anteriores...")
     client.clear_database()
     create_schema(client)
 
-    print("[4/5] Extraindo metadados estruturados via LLM (OpenAI)...")
-    decisions: list[DecisaoSTF] = []
-    for ext in extractions:
-        print(f"  Processando: {ext.arquivo}")
-        print(f"    Docling → Texto: {len(ext.texto_completo)} chars | "
-              f"Voto: {len(ext.voto)} chars | Dispositivo: {len(ext.dispositivo)} chars")
-        try:
-            decision = extract_metadata_from_text(
-                full_text=ext.texto_completo,
-                voto_text=ext.voto,
-                dispositivo_text=ext.dispositivo,
-                filename=ext.arquivo,
-            )
-            decisions.append(decision)
-            print(f"    LLM → Processo: {decision.numero_processo} | "
-                  f"Classe: {decision.classe} | "
-                  f"Relator: {decision.ministro_relator.nome}")
-            print(f"    LLM → Temas: {len(decision.temas)} | "
-                  f"Artigos: {len(decision.artigos_citados)} | "
-                  f"Precedentes: {len(decision.precedentes_citados)}")
-        except Exception as e:
-            print(f"    [ERRO] Falha na extração de metadados: {e}")
-
     print(f"\n[5/5] Ingerindo {len(decisions)} decisões no Knowledge Graph...")
     count = ingest_all(client, decisions)
+    # Espera os índices terminarem de popular, para a primeira consulta dos
+    # agentes não pagar por isso
+    await_indexes(client)
+
+    # Respostas em cache foram geradas sobre o grafo anterior
+    clear_response_cache()
+    invalidate_graph_cache()
 
     total_nodes = client.get_node_count()
     print(f"\n✓ {count} decisões ingeridas com sucesso.")
@@ -82,11 +176,34 @@ def main() -> None:
         default="data/decisions",
         help="Diretório com PDFs das decisões do STF",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processos paralelos para o Docling (padrão: número de CPUs)",
+    )
+    parser.add_argument(
+        "--llm-workers",
+        type=int,
+        default=8,
+        help="Chamadas simultâneas ao LLM na extração de metadados "
+             "(ajuste aos limites de RPM/TPM da sua conta OpenAI)",
+    )
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="Extrai metadados pela Batch API da OpenAI (mais barato, assíncrono, até 24h)",
+    )
     parser.add_argument(
         "--clear",
         action="store_true",
         help="Limpa o banco antes de ingerir",
     )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Só atualiza schema e propriedades derivadas do grafo existente (sem reingerir)",
+    )
     args = parser.parse_args()
 
     print("=" * 60)
@@ -101,11 +218,28 @@ def main() -> None:
 
         print("✓ Conectado ao Neo4j.")
 
+        if args.migrate:
+            print("Atualizando schema e dados do Knowledge Graph...")
+            create_schema(client)
+            migrate_data(client)
+            await_indexes(client)
+            # Resultados em cache podem ter sido gerados sem as propriedades novas
+            clear_response_cache()
+            invalidate_graph_cache()
+            print("✓ Migração concluída.")
+            return
+
         if args.clear:
             print("Limpando banco...")
             client.clear_database()
 
-        ingest_from_pdfs(client, args.pdf_dir)
+        ingest_from_pdfs(
+            client,
+            args.pdf_dir,
+            max_workers=args.workers,
+            llm_workers=args.llm_workers,
+            use_batch_api=args.batch_api,
+        )
 
     print("\n" + "=" * 60)
     print("  Ingestão concluída!")
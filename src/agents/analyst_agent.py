@@ -65,6 +65,11 @@ def create_analyst_agent() -> Agent:
             buscar_por_artigo,
             buscar_conexoes_multihop,
         ],
-        instructions=ANALYST_INSTRUCTIONS,
+        # Prefixo estático e byte a byte idêntico entre chamadas (instruções
+        # numa única string, tools em ordem fixa, sem data/hora): permite o
+        # cache automático de prompt da OpenAI. O conteúdo dinâmico (a
+        # pergunta) vai sempre depois, na mensagem do usuário.
+        instructions="\n".join(ANALYST_INSTRUCTIONS),
+        add_datetime_to_context=False,
         markdown=True,
     )
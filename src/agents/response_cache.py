@@ -0,0 +1,77 @@
+"""
+Cache de respostas do pipeline Analista → Revisor por hash da pergunta.
+
+Perguntas repetidas (comuns no modo interativo e em demonstrações) são
+respondidas direto do disco, sem nenhuma chamada ao LLM ou ao Neo4j.
+
+A chave combina a pergunta normalizada com o contexto que muda a resposta
+(modelos e versão das instruções). O cache deve ser limpo sempre que o
+Knowledge Graph é reconstruído (ver scripts/ingest.py).
+
+Defina RESPONSE_CACHE_DISABLE=1 para desativá-lo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from contextlib import closing
+
+from src.paths import CACHE_DIR
+
+CACHE_FILE = CACHE_DIR / "responses.sqlite3"
+
+
+def cache_enabled() -> bool:
+    """Indica se o cache de respostas está habilitado."""
+    return os.getenv("RESPONSE_CACHE_DISABLE", "").lower() not in ("1", "true", "yes")
+
+
+def make_cache_key(query: str, *context: str) -> str:
+    """Gera a chave do cache para uma pergunta.
+
+    Args:
+        query: Pergunta do usuário (normalizada: caixa e espaços).
+        context: Partes que alteram a resposta (ids de modelo, versão das instruções).
+    """
+    normalized = " ".join(query.lower().split())
+    payload = "\n".join([*context, normalized])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    CACHE_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(CACHE_FILE)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses ("
+        " key TEXT PRIMARY KEY,"
+        " content TEXT NOT NULL,"
+        " created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    )
+    return conn
+
+
+def get_cached_response(key: str) -> str | None:
+    """Retorna a resposta em cache para a chave, ou None."""
+    if not cache_enabled() or not CACHE_FILE.exists():
+        return None
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def put_cached_response(key: str, content: str) -> None:
+    """Armazena a resposta final do pipeline no cache."""
+    if not cache_enabled():
+        return
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, content) VALUES (?, ?)",
+            (key, content),
+        )
+
+
+def clear_response_cache() -> None:
+    """Remove todas as respostas em cache (ex.: após reingestão do KG)."""
+    CACHE_FILE.unlink(missing_ok=True)
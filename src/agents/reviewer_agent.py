@@ -26,7 +26,10 @@ REVIEWER_INSTRUCTIONS = [
     "fundamentadas nos dados estruturados do Knowledge Graph das decisões do STF.",
     "",
     "PROCESSO DE REVISÃO:",
-    "1. Use 'obter_dados_grafo_completo' para carregar todos os dados do KG.",
+    "1. Se a mensagem trouxer o bloco '=== DADOS DO KG CONSULTADOS PELO ANALISTA ===',",
+    "   verifique primeiro contra esses dados (são resultados reais das tools do KG) e",
+    "   só use suas tools para o que não estiver coberto por eles. Sem esse bloco,",
+    "   use 'obter_dados_grafo_completo' para carregar todos os dados do KG.",
     "2. Para cada afirmação na resposta do Analista, verifique se:",
     "   a) O número do processo citado existe no KG.",
     "   b) O ministro relator citado está correto.",
@@ -81,8 +84,12 @@ REVIEWER_INSTRUCTIONS = [
 
 
 def create_reviewer_agent() -> Agent:
-    """Cria e retorna o Agente Revisor configurado."""
-    model_id = os.getenv("OPENAI_MODEL_ID", "gpt-4o")
+    """Cria e retorna o Agente Revisor configurado.
+
+    A revisão é essencialmente conferir afirmações contra JSON do KG, então
+    usa por padrão um modelo menor e mais barato que o do Analista.
+    """
+    model_id = os.getenv("OPENAI_REVIEWER_MODEL_ID", "gpt-4o-mini")
 
     return Agent(
         name="Revisor Jurídico STF",
@@ -93,6 +100,8 @@ def create_reviewer_agent() -> Agent:
             buscar_decisao,
             listar_todas_decisoes,
         ],
-        instructions=REVIEWER_INSTRUCTIONS,
+        # Mesmo cuidado do Analista: prefixo estável para o cache de prompt.
+        instructions="\n".join(REVIEWER_INSTRUCTIONS),
+        add_datetime_to_context=False,
         markdown=True,
     )
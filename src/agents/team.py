@@ -2,17 +2,30 @@
 Orquestração do time de agentes: Analista + Revisor + Quality Monitor.
 
 Pipeline sequencial determinístico:
+0. Perguntas já respondidas são servidas do cache de respostas
 1. Analista consulta o KG e gera a resposta
 2. Revisor valida a resposta contra os dados do grafo
 3. Quality Monitor extrai métricas, exibe score e loga resultados
+
+Só respostas revisadas entram no cache. Respostas servidas do cache não são
+logadas de novo: o relatório de qualidade conta cada resposta gerada uma
+vez, não cada vez que ela foi exibida.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
 from dataclasses import dataclass
+from typing import Any
 
-from src.agents.analyst_agent import create_analyst_agent
-from src.agents.reviewer_agent import create_reviewer_agent
+from src.agents.analyst_agent import ANALYST_INSTRUCTIONS, create_analyst_agent
+from src.agents.response_cache import (
+    get_cached_response,
+    make_cache_key,
+    put_cached_response,
+)
+from src.agents.reviewer_agent import REVIEWER_INSTRUCTIONS, create_reviewer_agent
 from src.quality.monitor import (
     format_quality_summary,
     log_quality,
@@ -20,26 +33,66 @@ from src.quality.monitor import (
 )
 
 
-@dataclass
+# Muda sempre que as instruções dos agentes mudam, invalidando o cache.
+INSTRUCTIONS_VERSION = hashlib.sha256(
+    "\n".join(ANALYST_INSTRUCTIONS + REVIEWER_INSTRUCTIONS).encode("utf-8")
+).hexdigest()[:16]
+
+
+@dataclass(slots=True, frozen=True)
 class TeamResponse:
     """Resposta do time com análise, revisão e métricas."""
     content: str
 
 
+def _collect_kg_evidence(response: Any) -> str:
+    """Reúne os resultados das tools do KG chamadas pelo Analista.
+
+    Cada chamada vira um bloco com o nome da tool, os argumentos e o JSON
+    retornado, para o Revisor verificar sem consultar o grafo de novo.
+    """
+    tools = getattr(response, "tools", None) or []
+    blocks = []
+    for tool in tools:
+        if tool.result is None or tool.tool_call_error:
+            continue
+        args = json.dumps(tool.tool_args or {}, ensure_ascii=False, sort_keys=True)
+        blocks.append(f"### {tool.tool_name}({args})\n{tool.result}")
+    return "\n\n".join(blocks)
+
+
 class STFTeam:
     """Pipeline sequencial: Analista → Revisor → Quality Monitor."""
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.analyst = create_analyst_agent()
         self.reviewer = create_reviewer_agent()
+        self.use_cache = use_cache
+
+    def _cache_key(self, query: str) -> str:
+        return make_cache_key(
+            query,
+            self.analyst.model.id,
+            self.reviewer.model.id,
+            INSTRUCTIONS_VERSION,
+        )
 
     def run(self, query: str) -> TeamResponse:
         """Executa o pipeline Analista → Revisor → Quality Monitor.
 
+        0. Se a pergunta já foi respondida, devolve a resposta em cache (sem
+           registrá-la de novo no log de qualidade).
         1. O Analista consulta o KG e responde à pergunta.
         2. O Revisor verifica se a resposta está fundamentada no KG.
         3. O Quality Monitor extrai métricas, loga e exibe o score.
         """
+        cache_key = self._cache_key(query) if self.use_cache else ""
+        if cache_key:
+            cached = get_cached_response(cache_key)
+            if cached is not None:
+                print("  [Cache] Pergunta já respondida; usando resposta em cache.")
+                return TeamResponse(content=cached)
+
         # Passo 1: Analista consulta o KG
         print("  [Passo 1/3] Agente Analista consultando Knowledge Graph...")
         analyst_response = self.analyst.run(query)
@@ -50,12 +103,21 @@ class STFTeam:
 
         # Passo 2: Revisor verifica a resposta
         print("  [Passo 2/3] Agente Revisor verificando fidelidade ao KG...")
+        kg_evidence = _collect_kg_evidence(analyst_response)
         review_prompt = (
             "Revise a seguinte resposta do Agente Analista, verificando se TODAS "
             "as afirmações estão fundamentadas nos dados do Knowledge Graph das "
-            "decisões do STF. Use suas tools para consultar o grafo.\n\n"
-            f"=== RESPOSTA DO ANALISTA ===\n{analyst_text}"
+            "decisões do STF. "
         )
+        if kg_evidence:
+            review_prompt += (
+                "Verifique primeiro contra os dados do KG abaixo e use suas tools "
+                "apenas para o que não estiver coberto por eles.\n\n"
+                f"=== DADOS DO KG CONSULTADOS PELO ANALISTA ===\n{kg_evidence}\n\n"
+            )
+        else:
+            review_prompt += "Use suas tools para consultar o grafo.\n\n"
+        review_prompt += f"=== RESPOSTA DO ANALISTA ===\n{analyst_text}"
         reviewer_response = self.reviewer.run(review_prompt)
         reviewer_text = reviewer_response.content if reviewer_response and reviewer_response.content else ""
 
@@ -71,9 +133,14 @@ class STFTeam:
             final += f"\n\n---\n\n## Revisão do Agente Revisor\n\n{reviewer_text}"
         final += f"\n\n{quality_summary}"
 
+        # Sem revisão (falha ou resposta vazia do Revisor) a resposta não é
+        # guardada, para a próxima vez tentar a revisão de novo
+        if cache_key and reviewer_text:
+            put_cached_response(cache_key, final)
+
         return TeamResponse(content=final)
 
 
-def create_stf_team() -> STFTeam:
+def create_stf_team(use_cache: bool = True) -> STFTeam:
     """Cria e retorna o pipeline sequencial Analista + Revisor + Quality Monitor."""
-    return STFTeam()
+    return STFTeam(use_cache=use_cache)
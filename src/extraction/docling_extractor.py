@@ -7,18 +7,85 @@ seguindo os princípios de Context Engineering do QuaLLM-KG.
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from enum import Enum
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
+import pypdfium2 as pdfium
+from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
 from docling.datamodel.base_models import InputFormat
 from docling.datamodel.pipeline_options import OcrMacOptions, PdfPipelineOptions
 from docling.document_converter import DocumentConverter, PdfFormatOption
 
 from src.models.schemas import ExtractionResult
+from src.paths import CACHE_DIR
 
 
-def _build_converter() -> DocumentConverter:
-    """Cria o DocumentConverter com OCR habilitado para macOS (português)."""
+# Markdown gerado pelo Docling, endereçado pelo sha256 do PDF. Reprocessar
+# um PDF inalterado vira uma leitura de disco. DOCLING_CACHE_DISABLE=1 desativa.
+DOCLING_CACHE_DIR = CACHE_DIR / "docling"
+# Incrementar ao mudar o pipeline (backend, OCR, heurística da camada de
+# texto): a chave do cache inclui esta versão e a do Docling instalado.
+_PIPELINE_VERSION = 1
+
+# Mínimo de caracteres "legíveis" na 1ª página para confiar na camada de texto.
+_MIN_TEXT_LAYER_CHARS = 200
+# Fração mínima de caracteres alfanuméricos: fontes encriptadas costumam
+# gerar camadas de texto com símbolos sem sentido.
+_MIN_TEXT_LAYER_RATIO = 0.8
+
+
+def _has_text_layer(pdf_path: Path) -> bool:
+    """Verifica (pela 1ª página) se o PDF tem camada de texto aproveitável."""
+    try:
+        pdf = pdfium.PdfDocument(str(pdf_path))
+    except Exception:
+        return False
+    try:
+        if len(pdf) == 0:
+            return False
+        text = pdf[0].get_textpage().get_text_range()
+    except Exception:
+        return False
+    finally:
+        pdf.close()
+
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < _MIN_TEXT_LAYER_CHARS:
+        return False
+    readable = sum(1 for c in chars if c.isalnum() or c in ".,;:()-/§º°ª")
+    return readable / len(chars) >= _MIN_TEXT_LAYER_RATIO
+
+
+@lru_cache(maxsize=2)
+def _build_converter(ocr: bool = True) -> DocumentConverter:
+    """Cria o DocumentConverter para PDFs escaneados ou com camada de texto.
+
+    - ``ocr=True``: OCR de página inteira no macOS (português), necessário
+      para PDFs escaneados ou com fontes encriptadas.
+    - ``ocr=False``: backend PyPdfium lendo a camada de texto, sem OCR.
+
+    Memoizado por configuração: os modelos de layout/OCR são carregados uma
+    única vez por processo e reaproveitados em todos os PDFs.
+    """
+    if not ocr:
+        return DocumentConverter(
+            format_options={
+                InputFormat.PDF: PdfFormatOption(
+                    pipeline_options=PdfPipelineOptions(do_ocr=False),
+                    backend=PyPdfiumDocumentBackend,
+                )
+            }
+        )
+
     ocr_options = OcrMacOptions(
         lang=["pt-BR", "en-US"],
         force_full_page_ocr=True,
@@ -34,46 +101,151 @@ def _build_converter() -> DocumentConverter:
     )
 
 
-def _extract_section(text: str, section_name: str) -> str:
-    """Extrai uma seção específica do texto do acórdão.
+class Section(str, Enum):
+    """Seções reconhecidas nos acórdãos do STF."""
+
+    VOTO = "voto"
+    DISPOSITIVO = "dispositivo"
+    EMENTA = "ementa"
+    ACORDAO = "acordao"
+    RELATORIO = "relatorio"
+    EXTRATO_DE_ATA = "extrato_de_ata"
+
 
-    Tenta múltiplos padrões de regex para capturar variações de formatação
-    encontradas em acórdãos do STF.
+# Padrão do cabeçalho de cada seção. A forma espaçada ("V O T O") já cobre a
+# compacta ("VOTO"), pois o espaçamento entre as letras é opcional.
+_SECTION_HEADERS: dict[Section, str] = {
+    Section.VOTO: r"V[ \t]*O[ \t]*T[ \t]*O",
+    Section.DISPOSITIVO: r"D[ \t]*I[ \t]*S[ \t]*P[ \t]*O[ \t]*S[ \t]*I[ \t]*T[ \t]*I[ \t]*V[ \t]*O",
+    Section.EMENTA: r"EMENTA",
+    Section.ACORDAO: r"ACÓRDÃO",
+    Section.RELATORIO: r"RELATÓRIO",
+    Section.EXTRATO_DE_ATA: r"EXTRATO[ \t]+DE[ \t]+ATA",
+}
+
+# Uma única alternação ancorada em linha própria, tolerando marcadores de
+# markdown/separadores ("## VOTO", "--- DISPOSITIVO ---", "**VOTO**").
+# Cada seção vira um grupo nomeado com o nome do membro do enum.
+_HEADER_RE = re.compile(
+    r"^[ \t#*=_-]*(?:"
+    + "|".join(f"(?P<{section.name}>{pattern})" for section, pattern in _SECTION_HEADERS.items())
+    + r")[ \t*=_:.-]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+_SPACE_RUN_RE = re.compile(r"[ \t]{2,}")
+_STF_HEADER_RE = re.compile(r"SUPREMO TRIBUNAL FEDERAL.*?(?=\n)", re.IGNORECASE)
+_PAGE_NUM_RE = re.compile(r"\n\s*\d+\s*\n")
+
+
+def _split_sections(text: str) -> dict[Section, str]:
+    """Divide o texto do acórdão em seções numa única passada.
+
+    Localiza todos os cabeçalhos com um só ``finditer`` e recorta o texto
+    entre cada cabeçalho e o seguinte. Se uma seção aparece mais de uma vez,
+    vale a primeira ocorrência não vazia.
     """
-    patterns = [
-        # Padrão 1: "V O T O" ou "VOTO" seguido de conteúdo até próxima seção
-        rf"(?:^|\n)\s*{section_name}[\s\n]+(.*?)(?=\n\s*(?:DISPOSITIVO|EMENTA|ACÓRDÃO|RELATÓRIO|EXTRATO\s+DE\s+ATA|$))",
-        # Padrão 2: Seção com separador (traços, asteriscos)
-        rf"(?:^|\n)\s*[-*=]*\s*{section_name}\s*[-*=]*\s*\n(.*?)(?=\n\s*[-*=]*\s*(?:DISPOSITIVO|EMENTA|ACÓRDÃO|RELATÓRIO|$))",
-        # Padrão 3: Seção entre marcadores de página
-        rf"{section_name}\s*\n(.*?)(?=(?:DISPOSITIVO|EMENTA|ACÓRDÃO|RELATÓRIO|\Z))",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE | re.MULTILINE)
-        if match:
-            extracted = match.group(1).strip()
-            # Limpa artefatos de OCR e formatação
-            extracted = re.sub(r"\n{3,}", "\n\n", extracted)
-            extracted = re.sub(r"[ \t]{2,}", " ", extracted)
-            return extracted
-
-    return ""
+    headers = list(_HEADER_RE.finditer(text))
+    sections: dict[Section, str] = {}
+    for i, match in enumerate(headers):
+        section = Section[match.lastgroup]
+        if section in sections:
+            continue
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        body = text[match.end():end].strip()
+        if not body:
+            continue
+        # Limpa artefatos de OCR e formatação
+        body = _BLANK_RUN_RE.sub("\n\n", body)
+        body = _SPACE_RUN_RE.sub(" ", body)
+        sections[section] = body
+    return sections
 
 
 def _clean_text(text: str) -> str:
     """Remove artefatos comuns de extração de PDF."""
     # Remove cabeçalhos/rodapés repetidos do STF
-    text = re.sub(
-        r"SUPREMO TRIBUNAL FEDERAL.*?(?=\n)", "", text, flags=re.IGNORECASE
-    )
+    text = _STF_HEADER_RE.sub("", text)
     # Remove números de página isolados
-    text = re.sub(r"\n\s*\d+\s*\n", "\n", text)
+    text = _PAGE_NUM_RE.sub("\n", text)
     # Normaliza espaçamento
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _BLANK_RUN_RE.sub("\n\n", text)
     return text.strip()
 
 
+def _file_sha256(path: Path) -> str:
+    """Calcula o sha256 do conteúdo do arquivo, lendo em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _docling_version() -> str:
+    try:
+        return version("docling")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _docling_cache_key(pdf_path: Path) -> str:
+    """Chave do cache: sha256 do PDF + versão do pipeline + versão do Docling."""
+    return f"{_file_sha256(pdf_path)}-p{_PIPELINE_VERSION}-docling{_docling_version()}"
+
+
+def _docling_cache_enabled() -> bool:
+    return os.getenv("DOCLING_CACHE_DISABLE", "").lower() not in ("1", "true", "yes")
+
+
+def _load_cached_markdown(cache_key: str) -> dict | None:
+    """Lê o markdown em cache para o PDF, se existir."""
+    cache_file = DOCLING_CACHE_DIR / f"{cache_key}.json"
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _store_cached_markdown(cache_key: str, markdown: str, ocr: bool) -> None:
+    """Grava o markdown no cache de forma atômica (tmp + os.replace)."""
+    DOCLING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=DOCLING_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"markdown": markdown, "ocr": ocr}, f, ensure_ascii=False)
+        os.replace(tmp_path, DOCLING_CACHE_DIR / f"{cache_key}.json")
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _convert_to_markdown(pdf_path: Path) -> tuple[str, bool]:
+    """Converte o PDF em markdown com Docling, usando o cache em disco.
+
+    Returns:
+        Tupla (markdown, ocr) indicando se o OCR foi usado.
+    """
+    use_cache = _docling_cache_enabled()
+    cache_key = _docling_cache_key(pdf_path) if use_cache else ""
+    if use_cache:
+        cached = _load_cached_markdown(cache_key)
+        if cached is not None:
+            return cached["markdown"], cached["ocr"]
+
+    use_ocr = not _has_text_layer(pdf_path)
+    converter = _build_converter(ocr=use_ocr)
+    result = converter.convert(str(pdf_path))
+    markdown = result.document.export_to_markdown()
+
+    if use_cache:
+        _store_cached_markdown(cache_key, markdown, use_ocr)
+    return markdown, use_ocr
+
+
 def extract_from_pdf(pdf_path: str | Path) -> ExtractionResult:
     """Extrai texto de um PDF de decisão do STF usando Docling.
 
@@ -87,19 +259,12 @@ def extract_from_pdf(pdf_path: str | Path) -> ExtractionResult:
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF não encontrado: {pdf_path}")
 
-    converter = _build_converter()
-    result = converter.convert(str(pdf_path))
-
-    full_text = result.document.export_to_markdown()
-    full_text = _clean_text(full_text)
-
-    voto = _extract_section(full_text, "V\\s*O\\s*T\\s*O")
-    if not voto:
-        voto = _extract_section(full_text, "VOTO")
+    markdown, use_ocr = _convert_to_markdown(pdf_path)
+    full_text = _clean_text(markdown)
 
-    dispositivo = _extract_section(full_text, "D\\s*I\\s*S\\s*P\\s*O\\s*S\\s*I\\s*T\\s*I\\s*V\\s*O")
-    if not dispositivo:
-        dispositivo = _extract_section(full_text, "DISPOSITIVO")
+    sections = _split_sections(full_text)
+    voto = sections.get(Section.VOTO, "")
+    dispositivo = sections.get(Section.DISPOSITIVO, "")
 
     return ExtractionResult(
         arquivo=pdf_path.name,
@@ -111,18 +276,48 @@ def extract_from_pdf(pdf_path: str | Path) -> ExtractionResult:
             "tamanho_chars": len(full_text),
             "voto_encontrado": bool(voto),
             "dispositivo_encontrado": bool(dispositivo),
+            "ocr": use_ocr,
         },
     )
 
 
-def extract_all_from_directory(directory: str | Path) -> list[ExtractionResult]:
+def _extract_worker(pdf_path: Path) -> ExtractionResult | Exception:
+    """Extrai um PDF dentro do pool de processos sem derrubar o lote em caso de falha.
+
+    A falha volta ao processo principal como valor (e não é impressa aqui),
+    para ser reportada junto com o progresso. Vira ``RuntimeError`` com a
+    mesma mensagem porque nem toda exceção sobrevive ao pickle entre processos.
+    """
+    try:
+        return extract_from_pdf(pdf_path)
+    except Exception as e:
+        return RuntimeError(str(e))
+
+
+def extract_all_from_directory(
+    directory: str | Path,
+    max_workers: int | None = None,
+    on_result: Callable[[Path, ExtractionResult | Exception], None] | None = None,
+) -> list[ExtractionResult]:
     """Extrai texto de todos os PDFs em um diretório.
 
+    Os PDFs são independentes entre si, então são processados em paralelo
+    num pool de processos (o layout model do Docling é CPU-bound). Cada
+    processo só carrega os modelos se algum PDF dele não estiver em cache.
+    Nada é impresso aqui: sucesso e falha de cada PDF chegam pelo callback.
+
     Args:
         directory: Caminho para o diretório contendo PDFs.
+        max_workers: Número máximo de processos. Cada processo carrega seus
+            próprios modelos do Docling; reduza se a memória for limitada.
+            Padrão: número de CPUs.
+        on_result: Callback opcional ``(pdf, resultado)`` chamado no processo
+            principal à medida que cada PDF termina; ``resultado`` é a
+            exceção se a extração falhou (útil para progresso).
 
     Returns:
-        Lista de ExtractionResult, um por PDF.
+        Lista de ExtractionResult dos PDFs extraídos com sucesso (na ordem
+        dos arquivos).
     """
     directory = Path(directory)
     if not directory.is_dir():
@@ -132,12 +327,18 @@ def extract_all_from_directory(directory: str | Path) -> list[ExtractionResult]:
     if not pdf_files:
         raise FileNotFoundError(f"Nenhum PDF encontrado em: {directory}")
 
-    results = []
-    for pdf_path in pdf_files:
-        try:
-            result = extract_from_pdf(pdf_path)
-            results.append(result)
-        except Exception as e:
-            print(f"[ERRO] Falha ao processar {pdf_path.name}: {e}")
+    workers = min(max_workers or os.cpu_count() or 1, len(pdf_files))
+
+    results: list[ExtractionResult | Exception | None] = [None] * len(pdf_files)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_extract_worker, pdf_path): i
+            for i, pdf_path in enumerate(pdf_files)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if on_result is not None:
+                on_result(pdf_files[i], results[i])
 
-    return results
+    return [r for r in results if isinstance(r, ExtractionResult)]
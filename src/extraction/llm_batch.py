@@ -0,0 +1,188 @@
+"""
+Extração de metadados em lote via Batch API da OpenAI.
+
+Alternativa offline a ``extract_many`` para a ingestão de muitos PDFs: as
+requisições vão num único arquivo JSONL, são processadas pela OpenAI em até
+24h com ~50% de desconto e numa cota de rate limit separada. O caminho
+síncrono (``extract_metadata_from_text``) continua sendo o usado em modo
+interativo ou para um único PDF.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from openai import OpenAI
+
+from src.extraction.llm_cache import get_cached_llm_response, put_cached_llm_response
+from src.extraction.llm_metadata_extractor import (
+    _build_context,
+    _build_decision,
+    _cache_key,
+    _completion_kwargs,
+    _get_client,
+)
+from src.models.schemas import DecisaoSTF, ExtractionResult
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_batch_jsonl(extractions: list[ExtractionResult], model_id: str) -> Path:
+    """Gera o arquivo JSONL de entrada do batch, uma requisição por PDF.
+
+    O ``custom_id`` de cada linha é o nome do arquivo PDF.
+    """
+    fd, path = tempfile.mkstemp(prefix="stf_batch_", suffix=".jsonl")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for ext in extractions:
+            context_text = _build_context(ext.texto_completo, ext.voto, ext.dispositivo)
+            request = {
+                "custom_id": ext.arquivo,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": _completion_kwargs(model_id, context_text),
+            }
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+    return Path(path)
+
+
+def submit_batch(client: OpenAI, jsonl_path: Path) -> str:
+    """Envia o JSONL e cria o batch. Retorna o id do batch."""
+    with open(jsonl_path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def wait_for_batch(client: OpenAI, batch_id: str, poll_interval: float = 30.0):
+    """Consulta o batch periodicamente até atingir um status terminal."""
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        done = f"{counts.completed}/{counts.total}" if counts else "?"
+        print(f"  [BATCH] {batch_id}: {batch.status} ({done})")
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        time.sleep(poll_interval)
+
+
+def parse_batch_output(
+    output_text: str,
+    extractions: list[ExtractionResult],
+    cache_keys: dict[str, str] | None = None,
+) -> list[DecisaoSTF | Exception]:
+    """Converte o JSONL de saída do batch em decisões, na ordem de ``extractions``.
+
+    Requisições sem resposta bem-sucedida viram exceções na posição
+    correspondente, como em ``extract_many``. Se ``cache_keys`` (arquivo →
+    chave) for informado, as respostas válidas são gravadas no cache do LLM.
+    """
+    by_name = {ext.arquivo: ext for ext in extractions}
+    parsed: dict[str, DecisaoSTF | Exception] = {}
+
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        name = item.get("custom_id")
+        ext = by_name.get(name)
+        if ext is None:
+            continue
+
+        response = item.get("response") or {}
+        if item.get("error") or response.get("status_code") != 200:
+            error = item.get("error") or response.get("body", {}).get("error")
+            parsed[name] = ValueError(f"Requisição do batch falhou para {name}: {error}")
+            continue
+
+        try:
+            choice = response["body"]["choices"][0]
+            if choice.get("finish_reason") == "length":
+                raise ValueError(f"Resposta truncada pelo limite de tokens para {name}")
+            raw_json = choice["message"]["content"]
+            parsed[name] = _build_decision(json.loads(raw_json), ext.voto, ext.dispositivo, name)
+            if cache_keys and name in cache_keys:
+                put_cached_llm_response(cache_keys[name], raw_json)
+        except Exception as e:
+            parsed[name] = e
+
+    return [
+        parsed.get(ext.arquivo, ValueError(f"Sem resposta do batch para {ext.arquivo}"))
+        for ext in extractions
+    ]
+
+
+def extract_metadata_batch(
+    extractions: list[ExtractionResult],
+    poll_interval: float = 30.0,
+) -> list[DecisaoSTF | Exception]:
+    """Extrai metadados de vários documentos via Batch API (bloqueia até concluir).
+
+    Args:
+        extractions: Resultados do Docling, um por PDF (nomes de arquivo únicos).
+        poll_interval: Intervalo, em segundos, entre consultas ao status do batch.
+
+    Returns:
+        Lista na mesma ordem de ``extractions``, com a ``DecisaoSTF`` extraída
+        ou a exceção que impediu a extração.
+    """
+    if not extractions:
+        return []
+
+    model_id = os.getenv("OPENAI_MODEL_ID", "gpt-4o")
+
+    # Documentos já no cache do LLM não entram no batch
+    results: list[DecisaoSTF | Exception | None] = [None] * len(extractions)
+    pending: list[ExtractionResult] = []
+    cache_keys: dict[str, str] = {}
+    for i, ext in enumerate(extractions):
+        key = _cache_key(model_id, _build_context(ext.texto_completo, ext.voto, ext.dispositivo))
+        cached = get_cached_llm_response(key)
+        if cached is None:
+            pending.append(ext)
+            cache_keys[ext.arquivo] = key
+            continue
+        try:
+            results[i] = _build_decision(json.loads(cached), ext.voto, ext.dispositivo, ext.arquivo)
+        except Exception as e:
+            results[i] = e
+
+    if pending:
+        print(f"  {len(extractions) - len(pending)} documentos no cache; {len(pending)} no batch.")
+        pending_results = iter(_run_batch(pending, model_id, cache_keys, poll_interval))
+        results = [r if r is not None else next(pending_results) for r in results]
+
+    return results
+
+
+def _run_batch(
+    extractions: list[ExtractionResult],
+    model_id: str,
+    cache_keys: dict[str, str],
+    poll_interval: float,
+) -> list[DecisaoSTF | Exception]:
+    """Envia os documentos num batch, aguarda e devolve os resultados em ordem."""
+    client = _get_client()
+
+    jsonl_path = build_batch_jsonl(extractions, model_id)
+    try:
+        batch_id = submit_batch(client, jsonl_path)
+    finally:
+        jsonl_path.unlink(missing_ok=True)
+
+    batch = wait_for_batch(client, batch_id, poll_interval)
+    if not batch.output_file_id:
+        error = ValueError(f"Batch {batch_id} terminou como '{batch.status}' sem resultados")
+        return [error] * len(extractions)
+
+    output_text = client.files.content(batch.output_file_id).text
+    return parse_batch_output(output_text, extractions, cache_keys)
@@ -0,0 +1,61 @@
+"""
+Cache em disco das respostas do LLM na extração de metadados.
+
+A chave é o sha256 de tudo que determina a resposta (modelo, prompts e texto
+enviado), então reprocessar um PDF inalterado — reingestões, ajustes no
+schema do grafo — não chama o LLM de novo. Guarda o JSON bruto retornado,
+em ``.cache/llm/<hash[:2]>/<hash>.json``.
+
+Defina LLM_CACHE_DISABLE=1 para desativá-lo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from src.paths import CACHE_DIR
+
+LLM_CACHE_DIR = CACHE_DIR / "llm"
+
+
+def llm_cache_enabled() -> bool:
+    """Indica se o cache de respostas do LLM está habilitado."""
+    return os.getenv("LLM_CACHE_DISABLE", "").lower() not in ("1", "true", "yes")
+
+
+def llm_cache_key(*parts: str) -> str:
+    """Gera a chave do cache a partir das partes que determinam a resposta."""
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return LLM_CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def get_cached_llm_response(key: str) -> str | None:
+    """Retorna o JSON bruto em cache para a chave, ou None."""
+    if not llm_cache_enabled():
+        return None
+    try:
+        return _cache_path(key).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def put_cached_llm_response(key: str, raw_json: str) -> None:
+    """Grava o JSON bruto no cache de forma atômica (tmp + os.replace)."""
+    if not llm_cache_enabled():
+        return
+    path = _cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(raw_json)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
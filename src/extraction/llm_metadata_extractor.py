@@ -7,18 +7,35 @@ Recebe o texto extraído pelo Docling e usa o OpenAI para identificar:
 - Temas de Repercussão Geral
 - Artigos Constitucionais citados
 - Precedentes citados
+
+Há duas formas de uso:
+- ``extract_metadata_from_text``: síncrona, um documento por chamada.
+- ``extract_many``: assíncrona por baixo, extrai vários documentos com
+  concorrência limitada por um semáforo (chamadas ao LLM são I/O-bound).
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import threading
+import time
+from collections.abc import Callable
+from functools import lru_cache
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
+from src.extraction.llm_cache import (
+    get_cached_llm_response,
+    llm_cache_key,
+    put_cached_llm_response,
+)
 from src.models.schemas import (
     ArtigoConstitucional,
     DecisaoSTF,
+    ExtractionResult,
     MinistroRelator,
     TemaRepercussaoGeral,
 )
@@ -54,57 +71,128 @@ TEXTO DA DECISÃO:
 """
 
 
-def extract_metadata_from_text(
-    full_text: str,
-    voto_text: str,
-    dispositivo_text: str,
-    filename: str,
-) -> DecisaoSTF:
-    """Extrai metadados estruturados do texto de uma decisão usando o LLM.
+SYSTEM_PROMPT = "Você extrai metadados estruturados de decisões do STF. Responda SOMENTE com JSON válido."
 
-    Args:
-        full_text: Texto completo extraído pelo Docling.
-        voto_text: Texto do Voto (se extraído por regex).
-        dispositivo_text: Texto do Dispositivo (se extraído por regex).
-        filename: Nome do arquivo PDF de origem.
+MAX_ATTEMPTS = 3
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
 
-    Returns:
-        DecisaoSTF com metadados estruturados.
+_throttle_lock = threading.Lock()
+_next_call_at = 0.0
+
+
+def _reserve_call_slot() -> float:
+    """Reserva o próximo horário livre segundo ``OPENAI_MAX_RPM``.
+
+    Thread-safe. Retorna quantos segundos o chamador deve esperar antes de
+    fazer a requisição (0 se não houver limite definido).
     """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    model_id = os.getenv("OPENAI_MODEL_ID", "gpt-4o")
+    global _next_call_at
+    max_rpm = int(os.getenv("OPENAI_MAX_RPM") or 0)
+    if max_rpm <= 0:
+        return 0.0
+
+    interval = 60.0 / max_rpm
+    with _throttle_lock:
+        now = time.monotonic()
+        start = max(now, _next_call_at)
+        _next_call_at = start + interval
+    return start - now
+
+
+def _throttle() -> None:
+    """Espaça as chamadas síncronas ao OpenAI para respeitar ``OPENAI_MAX_RPM``."""
+    delay = _reserve_call_slot()
+    if delay > 0:
+        time.sleep(delay)
+
+
+async def _throttle_async() -> None:
+    """Versão assíncrona de ``_throttle`` (não bloqueia o event loop)."""
+    delay = _reserve_call_slot()
+    if delay > 0:
+        await asyncio.sleep(delay)
 
+
+@lru_cache(maxsize=1)
+def _get_client() -> OpenAI:
+    """Cliente síncrono compartilhado pelo processo.
+
+    Reaproveita o pool HTTP (conexões TCP/TLS em keep-alive) entre as
+    chamadas, em vez de abrir um cliente novo por PDF.
+    """
+    http_client = DefaultHttpxClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        timeout=HTTP_TIMEOUT,
+    )
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Corta ``text`` em até ``limit`` caracteres sem partir frases ao meio.
+
+    Prefere o último fim de parágrafo dentro do limite; se ele deixar de fora
+    mais de 20% do orçamento, recua só até o último espaço.
+    """
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    cut = head.rfind("\n\n")
+    if cut < limit * 0.8:
+        cut = max(head.rfind(" "), head.rfind("\n"))
+    return head[:cut].rstrip() if cut > 0 else head
+
+
+def _build_context(full_text: str, voto_text: str, dispositivo_text: str) -> str:
+    """Monta o texto enviado ao LLM a partir das seções extraídas."""
     # Envia sempre o texto completo para o LLM extrair metadados
-    context_text = full_text[:30000]
+    context_text = _truncate(full_text, 30000)
     if voto_text:
-        context_text += f"\n\n=== SEÇÃO VOTO (extraída) ===\n{voto_text[:8000]}"
+        context_text += f"\n\n=== SEÇÃO VOTO (extraída) ===\n{_truncate(voto_text, 8000)}"
     if dispositivo_text:
-        context_text += f"\n\n=== SEÇÃO DISPOSITIVO (extraída) ===\n{dispositivo_text[:4000]}"
+        context_text += f"\n\n=== SEÇÃO DISPOSITIVO (extraída) ===\n{_truncate(dispositivo_text, 4000)}"
+    return context_text
+
+
+def _completion_kwargs(model_id: str, context_text: str) -> dict:
+    """Argumentos da chamada ``chat.completions.create`` de extração."""
+    return {
+        "model": model_id,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": EXTRACTION_PROMPT + context_text},
+        ],
+        "temperature": 0.1,
+        "response_format": {"type": "json_object"},
+    }
 
-    raw_json = None
-    for attempt in range(3):
-        try:
-            response = client.chat.completions.create(
-                model=model_id,
-                messages=[
-                    {"role": "system", "content": "Você extrai metadados estruturados de decisões do STF. Responda SOMENTE com JSON válido."},
-                    {"role": "user", "content": EXTRACTION_PROMPT + context_text},
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"},
-            )
-            raw_json = response.choices[0].message.content
-            if raw_json:
-                break
-        except Exception as e:
-            print(f"    [RETRY {attempt+1}/3] Erro na chamada LLM: {e}")
 
+def _parse_response(response) -> tuple[str, dict]:
+    """Extrai e decodifica o JSON de uma resposta do ``chat.completions``.
+
+    Levanta ``ValueError`` (tratado como falha retentável) se a resposta vier
+    vazia, cortada pelo limite de tokens ou com JSON inválido.
+    """
+    choice = response.choices[0]
+    raw_json = choice.message.content
     if not raw_json:
-        raise ValueError(f"LLM retornou resposta vazia após 3 tentativas para {filename}")
+        raise ValueError("resposta vazia")
+    if choice.finish_reason == "length":
+        raise ValueError("resposta truncada pelo limite de tokens")
+    return raw_json, json.loads(raw_json)
+
 
-    data = json.loads(raw_json)
+def _cache_key(model_id: str, context_text: str) -> str:
+    """Chave do cache de respostas do LLM para uma requisição de extração."""
+    return llm_cache_key(model_id, SYSTEM_PROMPT, EXTRACTION_PROMPT, context_text)
 
-    # Converte para modelos Pydantic
+
+def _build_decision(
+    data: dict,
+    voto_text: str,
+    dispositivo_text: str,
+    filename: str,
+) -> DecisaoSTF:
+    """Converte o JSON retornado pelo LLM nos modelos Pydantic."""
     temas = []
     for t in data.get("temas", []):
         if t.get("descricao"):
@@ -141,3 +229,155 @@ def extract_metadata_from_text(
         voto_texto=final_voto,
         dispositivo_texto=final_dispositivo,
     )
+
+
+def extract_metadata_from_text(
+    full_text: str,
+    voto_text: str,
+    dispositivo_text: str,
+    filename: str,
+) -> DecisaoSTF:
+    """Extrai metadados estruturados do texto de uma decisão usando o LLM.
+
+    Args:
+        full_text: Texto completo extraído pelo Docling.
+        voto_text: Texto do Voto (se extraído por regex).
+        dispositivo_text: Texto do Dispositivo (se extraído por regex).
+        filename: Nome do arquivo PDF de origem.
+
+    Returns:
+        DecisaoSTF com metadados estruturados.
+    """
+    model_id = os.getenv("OPENAI_MODEL_ID", "gpt-4o")
+    context_text = _build_context(full_text, voto_text, dispositivo_text)
+
+    cache_key = _cache_key(model_id, context_text)
+    cached = get_cached_llm_response(cache_key)
+    if cached is not None:
+        return _build_decision(json.loads(cached), voto_text, dispositivo_text, filename)
+
+    client = _get_client()
+    raw_json = data = None
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            _throttle()
+            response = client.chat.completions.create(**_completion_kwargs(model_id, context_text))
+            # JSON inválido ou truncado também conta como falha e é retentado
+            raw_json, data = _parse_response(response)
+            break
+        except Exception as e:
+            print(f"    [RETRY {attempt+1}/{MAX_ATTEMPTS}] Erro na chamada LLM: {e}")
+        if attempt + 1 < MAX_ATTEMPTS:
+            time.sleep(2 ** attempt)
+
+    if data is None:
+        raise ValueError(f"LLM não retornou JSON válido após {MAX_ATTEMPTS} tentativas para {filename}")
+
+    decision = _build_decision(data, voto_text, dispositivo_text, filename)
+    # Só guarda respostas que de fato viraram uma decisão válida
+    put_cached_llm_response(cache_key, raw_json)
+    return decision
+
+
+async def _extract_one_async(
+    client: AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    model_id: str,
+    extraction: ExtractionResult,
+) -> DecisaoSTF:
+    """Extrai os metadados de um documento, respeitando o semáforo."""
+    context_text = _build_context(extraction.texto_completo, extraction.voto, extraction.dispositivo)
+
+    cache_key = _cache_key(model_id, context_text)
+    cached = get_cached_llm_response(cache_key)
+    if cached is not None:
+        return _build_decision(
+            json.loads(cached), extraction.voto, extraction.dispositivo, extraction.arquivo
+        )
+
+    raw_json = data = None
+    async with semaphore:
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                await _throttle_async()
+                response = await client.chat.completions.create(
+                    **_completion_kwargs(model_id, context_text)
+                )
+                raw_json, data = _parse_response(response)
+                break
+            except Exception as e:
+                print(f"    [RETRY {attempt+1}/{MAX_ATTEMPTS}] {extraction.arquivo}: Erro na chamada LLM: {e}")
+            if attempt + 1 < MAX_ATTEMPTS:
+                # Backoff exponencial: 1s, 2s, ...
+                await asyncio.sleep(2 ** attempt)
+
+    if data is None:
+        raise ValueError(
+            f"LLM não retornou JSON válido após {MAX_ATTEMPTS} tentativas para {extraction.arquivo}"
+        )
+
+    decision = _build_decision(data, extraction.voto, extraction.dispositivo, extraction.arquivo)
+    put_cached_llm_response(cache_key, raw_json)
+    return decision
+
+
+async def _extract_many_async(
+    extractions: list[ExtractionResult],
+    concurrency: int,
+    on_result: Callable[[int, DecisaoSTF | Exception], None] | None,
+) -> list[DecisaoSTF | Exception]:
+    model_id = os.getenv("OPENAI_MODEL_ID", "gpt-4o")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # Um único cliente para o lote inteiro, com pool HTTP dimensionado para a
+    # concorrência: todas as conexões simultâneas ficam em keep-alive e são
+    # reaproveitadas (o padrão do httpx mantém só 100 vivas). O cliente
+    # assíncrono fica preso ao event loop de ``asyncio.run``, por isso não é
+    # compartilhado entre lotes como o síncrono (``_get_client``).
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency,
+        ),
+        timeout=HTTP_TIMEOUT,
+    )
+    async with AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client) as client:
+
+        async def run(i: int, extraction: ExtractionResult) -> DecisaoSTF | Exception:
+            try:
+                result: DecisaoSTF | Exception = await _extract_one_async(
+                    client, semaphore, model_id, extraction
+                )
+            except Exception as e:
+                result = e
+            if on_result is not None:
+                on_result(i, result)
+            return result
+
+        return await asyncio.gather(*(run(i, ext) for i, ext in enumerate(extractions)))
+
+
+def extract_many(
+    extractions: list[ExtractionResult],
+    concurrency: int = 8,
+    on_result: Callable[[int, DecisaoSTF | Exception], None] | None = None,
+) -> list[DecisaoSTF | Exception]:
+    """Extrai metadados de vários documentos com chamadas concorrentes ao LLM.
+
+    A concorrência é limitada por um ``asyncio.Semaphore``; ajuste-a aos
+    limites de RPM/TPM do seu tier da OpenAI (``OPENAI_MAX_RPM`` também é
+    respeitado). Falhas de um documento não interrompem o lote.
+
+    Args:
+        extractions: Resultados do Docling, um por PDF.
+        concurrency: Número máximo de requisições simultâneas.
+        on_result: Callback opcional ``(índice, resultado)`` chamado à medida
+            que cada documento termina (útil para progresso).
+
+    Returns:
+        Lista na mesma ordem de ``extractions``, com a ``DecisaoSTF`` extraída
+        ou a exceção que impediu a extração.
+    """
+    if not extractions:
+        return []
+    return asyncio.run(_extract_many_async(extractions, concurrency, on_result))
@@ -5,9 +5,11 @@ Cliente Neo4j para conexão e execução de queries Cypher.
 from __future__ import annotations
 
 import os
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any
 
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, Session
 
 
 class Neo4jClient:
@@ -27,11 +29,47 @@ class Neo4jClient:
         self._driver = GraphDatabase.driver(
             self.uri, auth=(self.username, self.password)
         )
+        # Sessão compartilhada enquanto um bloco ``batch()`` estiver aberto
+        self._session: Session | None = None
 
     def close(self) -> None:
         """Fecha a conexão com o Neo4j."""
         self._driver.close()
 
+    @contextmanager
+    def _session_scope(self) -> Iterator[Session]:
+        """Usa a sessão do ``batch()`` em andamento ou abre uma só para a chamada."""
+        if self._session is not None:
+            yield self._session
+            return
+        with self._driver.session(database=self.database) as session:
+            yield session
+
+    @contextmanager
+    def batch(self) -> Iterator[Neo4jClient]:
+        """Reaproveita uma única sessão em todas as queries executadas no bloco.
+
+        Útil para rajadas de chamadas curtas (ex.: ingestão em lotes), que
+        de outra forma abririam uma sessão por query. Cada ``run_write``
+        continua sendo uma transação própria. Não compartilhe o cliente
+        entre threads dentro do bloco: sessões do Neo4j não são thread-safe.
+
+        Example:
+            with client.batch():
+                for lote in lotes:
+                    client.run_write(query, {"rows": lote})
+        """
+        if self._session is not None:
+            # Blocos aninhados usam a sessão do bloco externo
+            yield self
+            return
+        with self._driver.session(database=self.database) as session:
+            self._session = session
+            try:
+                yield self
+            finally:
+                self._session = None
+
     def run_query(self, query: str, parameters: dict[str, Any] | None = None) -> list[dict]:
         """Executa uma query Cypher e retorna os resultados como lista de dicts.
 
@@ -43,7 +81,7 @@ class Neo4jClient:
             Lista de dicionários com os resultados.
         """
         parameters = parameters or {}
-        with self._driver.session(database=self.database) as session:
+        with self._session_scope() as session:
             result = session.run(query, parameters)
             return [record.data() for record in result]
 
@@ -55,7 +93,7 @@ class Neo4jClient:
             parameters: Parâmetros para a query.
         """
         parameters = parameters or {}
-        with self._driver.session(database=self.database) as session:
+        with self._session_scope() as session:
             session.execute_write(lambda tx: tx.run(query, parameters))
 
     def verify_connection(self) -> bool:
@@ -4,8 +4,8 @@ Schema do Knowledge Graph e funções de ingestão de dados no Neo4j.
 Schema:
   (:Processo_STF {numero, classe, voto_texto, dispositivo_texto, data_julgamento})
   (:Ministro_Relator {nome})
-  (:Tema_Repercussao_Geral {numero, descricao})
-  (:Artigo_Constitucional {artigo, descricao})
+  (:Tema_Repercussao_Geral {numero, descricao, descricao_lower})
+  (:Artigo_Constitucional {artigo, artigo_lower, descricao})
 
   (Processo_STF)-[:RELATADO_POR]->(Ministro_Relator)
   (Processo_STF)-[:TRATA_DE]->(Tema_Repercussao_Geral)
@@ -15,6 +15,9 @@ Schema:
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 from src.graph.neo4j_client import Neo4jClient
 from src.models.schemas import DecisaoSTF
 
@@ -26,110 +29,128 @@ CONSTRAINTS_AND_INDEXES = [
     "CREATE CONSTRAINT artigo_id IF NOT EXISTS FOR (a:Artigo_Constitucional) REQUIRE a.artigo IS UNIQUE",
     "CREATE INDEX processo_classe IF NOT EXISTS FOR (p:Processo_STF) ON (p.classe)",
     "CREATE INDEX processo_data IF NOT EXISTS FOR (p:Processo_STF) ON (p.data_julgamento)",
+    # Buscas parciais (CONTAINS) das tools por tema e por artigo
+    "CREATE TEXT INDEX tema_descricao_lower IF NOT EXISTS FOR (t:Tema_Repercussao_Geral) ON (t.descricao_lower)",
+    "CREATE TEXT INDEX artigo_lower IF NOT EXISTS FOR (a:Artigo_Constitucional) ON (a.artigo_lower)",
+]
+
+# Migrações idempotentes de dados, para grafos criados antes de uma mudança
+# de schema (só tocam nós em que a propriedade ainda falta).
+DATA_MIGRATIONS = [
+    "MATCH (t:Tema_Repercussao_Geral) WHERE t.descricao_lower IS NULL AND t.descricao IS NOT NULL "
+    "SET t.descricao_lower = toLower(t.descricao)",
+    "MATCH (a:Artigo_Constitucional) WHERE a.artigo_lower IS NULL AND a.artigo IS NOT NULL "
+    "SET a.artigo_lower = toLower(a.artigo)",
 ]
 
 
+def _apply_ddl(client: Neo4jClient, stmt: str) -> None:
+    try:
+        client.run_write(stmt)
+    except Exception as e:
+        # Ignora se constraint/index já existe
+        if "already exists" not in str(e).lower():
+            raise
+
+
 def create_schema(client: Neo4jClient) -> None:
-    """Cria constraints e índices no Neo4j."""
-    for stmt in CONSTRAINTS_AND_INDEXES:
-        try:
-            client.run_write(stmt)
-        except Exception as e:
-            # Ignora se constraint/index já existe
-            if "already exists" not in str(e).lower():
-                raise
+    """Cria constraints e índices no Neo4j.
+
+    Cada comando de DDL vai numa sessão própria, em paralelo, para que os
+    índices sejam construídos ao mesmo tempo em vez de um após o outro.
+    """
+    with ThreadPoolExecutor(max_workers=len(CONSTRAINTS_AND_INDEXES)) as executor:
+        list(executor.map(partial(_apply_ddl, client), CONSTRAINTS_AND_INDEXES))
+
+
+def migrate_data(client: Neo4jClient) -> None:
+    """Aplica ``DATA_MIGRATIONS`` a um grafo já existente (idempotente)."""
+    for stmt in DATA_MIGRATIONS:
+        client.run_write(stmt)
+
+
+def await_indexes(client: Neo4jClient, timeout_seconds: int = 300) -> None:
+    """Bloqueia até todos os índices ficarem ONLINE (ex.: logo após a ingestão)."""
+    client.run_query("CALL db.awaitIndexes($timeout)", {"timeout": timeout_seconds})
+
+
+# Ingestão completa de um lote de decisões numa única query: cada linha traz
+# o processo, o relator e as listas de temas/artigos/precedentes, que são
+# desdobradas em subqueries (CALL sem RETURN não descarta a linha externa
+# quando a lista está vazia). Temas e artigos são compartilhados entre
+# decisões: a descrição só é gravada quando o nó é criado, para que cada
+# nova citação não reescreva o mesmo nó.
+_INGEST_DECISIONS = """
+UNWIND $rows AS row
+MERGE (p:Processo_STF {numero: row.numero})
+SET p.classe = row.classe,
+    p.voto_texto = row.voto,
+    p.dispositivo_texto = row.dispositivo,
+    p.data_julgamento = row.data
+MERGE (m:Ministro_Relator {nome: row.relator})
+MERGE (p)-[:RELATADO_POR]->(m)
+WITH p, row
+CALL {
+    WITH p, row
+    UNWIND row.temas AS tema
+    MERGE (t:Tema_Repercussao_Geral {numero: tema.numero})
+    ON CREATE SET t.descricao = tema.descricao,
+                  t.descricao_lower = toLower(tema.descricao)
+    MERGE (p)-[:TRATA_DE]->(t)
+}
+CALL {
+    WITH p, row
+    UNWIND row.artigos AS artigo
+    MERGE (a:Artigo_Constitucional {artigo: artigo.artigo})
+    ON CREATE SET a.descricao = artigo.descricao,
+                  a.artigo_lower = toLower(artigo.artigo)
+    MERGE (p)-[:CITA_ARTIGO]->(a)
+}
+CALL {
+    WITH p, row
+    UNWIND row.precedentes AS prec_numero
+    MERGE (prec:Processo_STF {numero: prec_numero})
+    MERGE (p)-[:CITA_PRECEDENTE]->(prec)
+}
+"""
+
+# Decisões por transação em ingest_all.
+INGEST_BATCH_SIZE = 500
+
+
+def _decision_row(decisao: DecisaoSTF) -> dict:
+    """Converte uma decisão nos parâmetros de uma linha de ``_INGEST_DECISIONS``."""
+    return {
+        "numero": decisao.numero_processo,
+        "classe": decisao.classe,
+        "voto": decisao.voto_texto,
+        "dispositivo": decisao.dispositivo_texto,
+        "data": decisao.data_julgamento,
+        "relator": decisao.ministro_relator.nome,
+        "temas": [{"numero": t.numero, "descricao": t.descricao} for t in decisao.temas],
+        "artigos": [
+            {"artigo": a.artigo, "descricao": a.descricao} for a in decisao.artigos_citados
+        ],
+        "precedentes": list(decisao.precedentes_citados),
+    }
 
 
 def ingest_decision(client: Neo4jClient, decisao: DecisaoSTF) -> None:
     """Ingere uma decisão do STF no Knowledge Graph.
 
-    Cria nós e relações para: Processo, Ministro, Temas, Artigos e Precedentes.
+    Cria nós e relações para: Processo, Ministro, Temas, Artigos e Precedentes,
+    numa única query e numa única transação.
     """
-    # 1. Cria nó Processo_STF
-    client.run_write(
-        """
-        MERGE (p:Processo_STF {numero: $numero})
-        SET p.classe = $classe,
-            p.voto_texto = $voto,
-            p.dispositivo_texto = $dispositivo,
-            p.data_julgamento = $data
-        """,
-        {
-            "numero": decisao.numero_processo,
-            "classe": decisao.classe,
-            "voto": decisao.voto_texto,
-            "dispositivo": decisao.dispositivo_texto,
-            "data": decisao.data_julgamento,
-        },
-    )
-
-    # 2. Cria nó Ministro_Relator e relação RELATADO_POR
-    client.run_write(
-        """
-        MERGE (m:Ministro_Relator {nome: $nome})
-        WITH m
-        MATCH (p:Processo_STF {numero: $numero})
-        MERGE (p)-[:RELATADO_POR]->(m)
-        """,
-        {
-            "nome": decisao.ministro_relator.nome,
-            "numero": decisao.numero_processo,
-        },
-    )
-
-    # 3. Cria nós Tema_Repercussao_Geral e relações TRATA_DE
-    for tema in decisao.temas:
-        client.run_write(
-            """
-            MERGE (t:Tema_Repercussao_Geral {numero: $tema_numero})
-            SET t.descricao = $descricao
-            WITH t
-            MATCH (p:Processo_STF {numero: $numero})
-            MERGE (p)-[:TRATA_DE]->(t)
-            """,
-            {
-                "tema_numero": tema.numero,
-                "descricao": tema.descricao,
-                "numero": decisao.numero_processo,
-            },
-        )
-
-    # 4. Cria nós Artigo_Constitucional e relações CITA_ARTIGO
-    for artigo in decisao.artigos_citados:
-        client.run_write(
-            """
-            MERGE (a:Artigo_Constitucional {artigo: $artigo})
-            SET a.descricao = $descricao
-            WITH a
-            MATCH (p:Processo_STF {numero: $numero})
-            MERGE (p)-[:CITA_ARTIGO]->(a)
-            """,
-            {
-                "artigo": artigo.artigo,
-                "descricao": artigo.descricao,
-                "numero": decisao.numero_processo,
-            },
-        )
-
-    # 5. Cria relações CITA_PRECEDENTE entre processos
-    for precedente_numero in decisao.precedentes_citados:
-        client.run_write(
-            """
-            MERGE (prec:Processo_STF {numero: $prec_numero})
-            WITH prec
-            MATCH (p:Processo_STF {numero: $numero})
-            MERGE (p)-[:CITA_PRECEDENTE]->(prec)
-            """,
-            {
-                "prec_numero": precedente_numero,
-                "numero": decisao.numero_processo,
-            },
-        )
+    client.run_write(_INGEST_DECISIONS, {"rows": [_decision_row(decisao)]})
 
 
 def ingest_all(client: Neo4jClient, decisoes: list[DecisaoSTF]) -> int:
     """Ingere uma lista de decisões no Knowledge Graph.
 
+    Grava lotes de até ``INGEST_BATCH_SIZE`` decisões, cada lote numa única
+    transação. Se um lote falhar, reprocessa suas decisões uma a uma para
+    isolar as que têm problema.
+
     Args:
         client: Cliente Neo4j.
         decisoes: Lista de decisões a serem ingeridas.
@@ -138,11 +159,25 @@ def ingest_all(client: Neo4jClient, decisoes: list[DecisaoSTF]) -> int:
         Número de decisões ingeridas com sucesso.
     """
     count = 0
-    for decisao in decisoes:
-        try:
-            ingest_decision(client, decisao)
-            count += 1
-            print(f"  [OK] {decisao.numero_processo}")
-        except Exception as e:
-            print(f"  [ERRO] {decisao.numero_processo}: {e}")
+    # Uma única sessão para todos os lotes (e para o fallback um a um)
+    with client.batch():
+        for start in range(0, len(decisoes), INGEST_BATCH_SIZE):
+            batch = decisoes[start:start + INGEST_BATCH_SIZE]
+            try:
+                client.run_write(_INGEST_DECISIONS, {"rows": [_decision_row(d) for d in batch]})
+            except Exception as e:
+                print(f"  [AVISO] Falha na ingestão em lote ({e}); ingerindo uma a uma...")
+            else:
+                for decisao in batch:
+                    print(f"  [OK] {decisao.numero_processo}")
+                count += len(batch)
+                continue
+
+            for decisao in batch:
+                try:
+                    ingest_decision(client, decisao)
+                    count += 1
+                    print(f"  [OK] {decisao.numero_processo}")
+                except Exception as e:
+                    print(f"  [ERRO] {decisao.numero_processo}: {e}")
     return count
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class MinistroRelator(BaseModel):
@@ -36,6 +36,8 @@ class DecisaoSTF(BaseModel):
 
 class ExtractionResult(BaseModel):
     """Resultado da extração de um PDF via Docling."""
+    model_config = ConfigDict(frozen=True)
+
     arquivo: str
     texto_completo: str
     voto: str
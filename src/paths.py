@@ -0,0 +1,13 @@
+"""
+Caminhos do projeto, resolvidos a partir da raiz do repositório.
+
+Caches e marcadores compartilhados entre processos (chat, ingestão) não
+podem depender do diretório de trabalho de quem os abriu.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / ".cache"
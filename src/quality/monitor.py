@@ -3,18 +3,31 @@ Quality Monitor: extrai métricas estruturadas da revisão e mantém log acumula
 
 Implementa o princípio de Quality-by-Design do QuaLLM-KG (Karki et al., 2026):
 monitoramento quantitativo da fidelidade das respostas ao Knowledge Graph.
+
+O JSONL é a fonte da verdade; ``.cache/quality.sqlite3`` é um índice derivado
+usado só pelo relatório agregado, criado e sincronizado apenas por ele. O
+índice guarda até que byte do JSONL já foi indexado e qual arquivo era esse
+(inode e hash da 1ª linha): antes de cada relatório só o trecho novo é lido,
+e se o JSONL foi trocado, truncado ou apagado o índice é refeito do zero.
 """
 
 from __future__ import annotations
 
+import atexit
+import hashlib
 import json
-import re
-from dataclasses import asdict, dataclass, field
-from datetime import datetime
+import os
+import sqlite3
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field, fields
 from pathlib import Path
+from typing import TextIO
+
+from src.paths import CACHE_DIR
 
 
-@dataclass
+@dataclass(slots=True)
 class QualityMetrics:
     """Métricas de qualidade extraídas da revisão."""
     validado: bool = False
@@ -26,7 +39,7 @@ class QualityMetrics:
     problemas: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class QualityLogEntry:
     """Entrada completa do log de qualidade."""
     timestamp: str
@@ -38,36 +51,95 @@ class QualityLogEntry:
 
 LOG_DIR = Path("logs")
 LOG_FILE = LOG_DIR / "quality_log.jsonl"
+QUALITY_DB = CACHE_DIR / "quality.sqlite3"
+
+# Incrementar ao mudar quais linhas ou colunas entram no índice: força a
+# reconstrução dos índices existentes
+_INDEX_VERSION = 2
+_INSERT_ROW = "INSERT INTO quality_log VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+_SEP50 = "=" * 50
+_SEP60 = "=" * 60
+
+# Último segundo formatado por _fast_iso: (epoch em segundos, prefixo ISO)
+_iso_second: tuple[int, str] = (-1, "")
+
+# Handle do log e conexão do índice, mantidos abertos durante o processo
+# (abertos sob demanda)
+_LOG_FH: TextIO | None = None
+_QUALITY_CONN: sqlite3.Connection | None = None
+
+_METRICS_FENCE = "```quality_metrics"
+# Chaves que identificam o JSON de métricas fora do bloco delimitado
+_METRICS_KEYS = ('"validado"', '"score_fidelidade"')
+
+
+def _balanced_object(text: str, start: int) -> str | None:
+    """Retorna o objeto JSON que abre em ``text[start]``, casando as chaves.
+
+    Ignora chaves dentro de strings. Retorna None se o objeto não fechar.
+    """
+    depth = 0
+    in_string = escaped = False
+    for pos in range(start, len(text)):
+        ch = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    return None
+
+
+def _extract_metrics_json(text: str) -> str | None:
+    """Localiza o JSON de métricas na resposta do Revisor.
+
+    Usa o bloco ```quality_metrics ... ``` se houver; senão, o primeiro objeto
+    JSON que contenha uma das chaves de métricas.
+    """
+    i = text.find(_METRICS_FENCE)
+    if i != -1:
+        start = i + len(_METRICS_FENCE)
+        j = text.find("```", start)
+        if j != -1:
+            return text[start:j].strip()
+
+    # Fallback: objeto JSON solto (ou num bloco ```json) com as métricas
+    for key in _METRICS_KEYS:
+        k = text.find(key)
+        if k == -1:
+            continue
+        start = text.rfind("{", 0, k)
+        if start != -1:
+            return _balanced_object(text, start)
+    return None
 
 
 def parse_metrics_from_review(reviewer_text: str) -> QualityMetrics:
     """Extrai o bloco quality_metrics JSON da resposta do Revisor.
 
     Procura um bloco delimitado por ```quality_metrics ... ``` na resposta.
-    Se não encontrar, tenta extrair um bloco JSON genérico.
+    Se não encontrar, tenta extrair um objeto JSON solto com as métricas.
 
     Returns:
         QualityMetrics com os valores extraídos, ou defaults se parsing falhar.
     """
-    # Tenta extrair bloco ```quality_metrics ... ```
-    pattern = r"```quality_metrics\s*\n?(.*?)\n?```"
-    match = re.search(pattern, reviewer_text, re.DOTALL)
-
-    if not match:
-        # Fallback: tenta extrair qualquer bloco JSON com score_fidelidade
-        pattern = r"```(?:json)?\s*\n?(\{[^}]*score_fidelidade[^}]*\})\n?```"
-        match = re.search(pattern, reviewer_text, re.DOTALL)
-
-    if not match:
-        # Último fallback: procura JSON inline
-        pattern = r'(\{"validado".*?"problemas"\s*:\s*\[.*?\]\s*\})'
-        match = re.search(pattern, reviewer_text, re.DOTALL)
-
-    if not match:
+    raw = _extract_metrics_json(reviewer_text)
+    if raw is None:
         return QualityMetrics()
 
     try:
-        data = json.loads(match.group(1).strip())
+        data = json.loads(raw)
         return QualityMetrics(
             validado=data.get("validado", False),
             score_fidelidade=float(data.get("score_fidelidade", 0.0)),
@@ -77,29 +149,194 @@ def parse_metrics_from_review(reviewer_text: str) -> QualityMetrics:
             processos_verificados=data.get("processos_verificados", []),
             problemas=data.get("problemas", []),
         )
-    except (json.JSONDecodeError, ValueError, TypeError):
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError):
         return QualityMetrics()
 
 
+def _fast_iso() -> str:
+    """Timestamp local ISO 8601 com microssegundos, como ``datetime.now().isoformat()``.
+
+    Só formata a parte de data/hora quando o segundo muda; dentro do mesmo
+    segundo reaproveita o prefixo e acrescenta os microssegundos.
+    """
+    global _iso_second
+    ns = time.time_ns()
+    sec = ns // 1_000_000_000
+    if sec != _iso_second[0]:
+        _iso_second = (sec, time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(sec)))
+    return f"{_iso_second[1]}.{(ns // 1000) % 1_000_000:06d}"
+
+
+def _get_log_fh() -> TextIO:
+    """Abre (uma única vez) o arquivo de log em modo append."""
+    global _LOG_FH
+    if _LOG_FH is None:
+        LOG_DIR.mkdir(exist_ok=True)
+        _LOG_FH = open(LOG_FILE, "a", encoding="utf-8")
+        atexit.register(_LOG_FH.close)
+    return _LOG_FH
+
+
+_METRICS_FIELDS = frozenset(f.name for f in fields(QualityMetrics))
+
+
+def _is_report_entry(data: dict) -> bool:
+    """Indica se a linha entra no relatório (as mesmas que ``load_quality_log`` aceita).
+
+    Linhas sem ``timestamp``/``query`` ou com métricas desconhecidas ficam de fora.
+    """
+    metrics = data.get("metrics", {})
+    return (
+        "timestamp" in data
+        and "query" in data
+        and isinstance(metrics, dict)
+        and metrics.keys() <= _METRICS_FIELDS
+    )
+
+
+def _db_row(data: dict) -> tuple:
+    """Converte uma entrada do log (dict) numa linha da tabela ``quality_log``."""
+    metrics = data.get("metrics") or {}
+    return (
+        data.get("timestamp", ""),
+        data.get("query", ""),
+        int(bool(metrics.get("validado", False))),
+        float(metrics.get("score_fidelidade", 0.0)),
+        int(metrics.get("total_afirmacoes", 0)),
+        int(metrics.get("verificadas_ok", 0)),
+        int(metrics.get("sem_fundamentacao", 0)),
+        int(data.get("analyst_chars", 0)),
+        int(data.get("reviewer_chars", 0)),
+    )
+
+
+def _open_quality_db() -> sqlite3.Connection:
+    """Abre (uma única vez) o índice SQLite do log, criando-o se preciso."""
+    global _QUALITY_CONN
+    if _QUALITY_CONN is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(QUALITY_DB)
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quality_log ("
+                " timestamp TEXT NOT NULL,"
+                " query TEXT NOT NULL,"
+                " validado INTEGER NOT NULL,"
+                " score_fidelidade REAL NOT NULL,"
+                " total_afirmacoes INTEGER NOT NULL,"
+                " verificadas_ok INTEGER NOT NULL,"
+                " sem_fundamentacao INTEGER NOT NULL,"
+                " analyst_chars INTEGER NOT NULL,"
+                " reviewer_chars INTEGER NOT NULL)"
+            )
+            # jsonl_offset: bytes do JSONL já refletidos na tabela;
+            # jsonl_id: identidade do arquivo indexado (ver _jsonl_identity)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS index_meta ("
+                " key TEXT PRIMARY KEY,"
+                " value NOT NULL)"
+            )
+        atexit.register(conn.close)
+        _QUALITY_CONN = conn
+    return _QUALITY_CONN
+
+
+def _get_meta(conn: sqlite3.Connection, key: str, default):
+    row = conn.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_meta(conn: sqlite3.Connection, key: str, value) -> None:
+    conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def _jsonl_identity(f, inode: int) -> str:
+    """Identifica o arquivo do log: inode + sha256 da 1ª linha (e a versão do índice).
+
+    O tamanho sozinho não basta: um JSONL trocado ou truncado que volte a
+    crescer além do offset salvo seria somado ao índice antigo.
+    """
+    f.seek(0)
+    first_line = f.readline()
+    return f"{_INDEX_VERSION}:{inode}:{hashlib.sha256(first_line).hexdigest()}"
+
+
+def _sync_quality_index(conn: sqlite3.Connection) -> None:
+    """Traz o índice em dia com o JSONL, lendo só o trecho ainda não indexado."""
+    with conn:
+        try:
+            f = open(LOG_FILE, "rb")
+        except FileNotFoundError:
+            conn.execute("DELETE FROM quality_log")
+            _set_meta(conn, "jsonl_offset", 0)
+            _set_meta(conn, "jsonl_id", "")
+            return
+
+        with f:
+            st = os.fstat(f.fileno())
+            identity = _jsonl_identity(f, st.st_ino)
+            offset = _get_meta(conn, "jsonl_offset", 0)
+            if st.st_size < offset or identity != _get_meta(conn, "jsonl_id", ""):
+                # Outro arquivo, ou o mesmo truncado: refaz o índice do zero
+                conn.execute("DELETE FROM quality_log")
+                offset = 0
+            f.seek(offset)
+            tail = f.read(st.st_size - offset)
+
+        # Uma linha ainda incompleta fica para a próxima sincronização
+        complete = tail.rfind(b"\n") + 1
+        rows = []
+        for data in _parse_jsonl(tail[:complete]):
+            if not _is_report_entry(data):
+                continue
+            try:
+                rows.append(_db_row(data))
+            except (TypeError, ValueError):
+                continue
+        conn.executemany(_INSERT_ROW, rows)
+        _set_meta(conn, "jsonl_offset", offset + complete)
+        _set_meta(conn, "jsonl_id", identity)
+
+
 def log_quality(
     query: str,
     metrics: QualityMetrics,
     analyst_text: str = "",
     reviewer_text: str = "",
 ) -> None:
-    """Salva uma entrada no log acumulativo de qualidade (JSONL)."""
-    LOG_DIR.mkdir(exist_ok=True)
+    """Salva uma entrada no log acumulativo de qualidade (JSONL).
 
+    Cada entrada é gravada numa única escrita e enviada ao disco na hora:
+    outros processos (ex.: ``--quality-report``) a veem imediatamente, e
+    processos que anexam ao mesmo arquivo não intercalam linhas pela metade.
+    """
     entry = QualityLogEntry(
-        timestamp=datetime.now().isoformat(),
+        timestamp=_fast_iso(),
         query=query,
         metrics=metrics,
         analyst_chars=len(analyst_text),
         reviewer_chars=len(reviewer_text),
     )
 
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+    # Dict montado à mão: asdict() faria deepcopy recursivo de tudo
+    entry_dict = {
+        "timestamp": entry.timestamp,
+        "query": entry.query,
+        "metrics": {
+            "validado": metrics.validado,
+            "score_fidelidade": metrics.score_fidelidade,
+            "total_afirmacoes": metrics.total_afirmacoes,
+            "verificadas_ok": metrics.verificadas_ok,
+            "sem_fundamentacao": metrics.sem_fundamentacao,
+            "processos_verificados": metrics.processos_verificados,
+            "problemas": metrics.problemas,
+        },
+        "analyst_chars": entry.analyst_chars,
+        "reviewer_chars": entry.reviewer_chars,
+    }
+    fh = _get_log_fh()
+    fh.write(json.dumps(entry_dict, ensure_ascii=False) + "\n")
+    fh.flush()
 
 
 def format_quality_summary(metrics: QualityMetrics) -> str:
@@ -107,71 +344,141 @@ def format_quality_summary(metrics: QualityMetrics) -> str:
     status = "✅ Validado" if metrics.validado else "⚠️ Problemas encontrados"
     score = f"{metrics.score_fidelidade:.1f}%"
 
-    summary = (
-        f"\n{'=' * 50}\n"
+    parts = [
+        "",
+        _SEP50,
         f"📊 Quality Score: {score} "
-        f"({metrics.verificadas_ok}/{metrics.total_afirmacoes} afirmações verificadas)\n"
-        f"   Status: {status}\n"
-        f"   Processos verificados: {', '.join(metrics.processos_verificados) or 'N/A'}"
-    )
-
+        f"({metrics.verificadas_ok}/{metrics.total_afirmacoes} afirmações verificadas)",
+        f"   Status: {status}",
+        f"   Processos verificados: {', '.join(metrics.processos_verificados) or 'N/A'}",
+    ]
     if metrics.problemas:
-        summary += "\n   Problemas:"
-        for p in metrics.problemas:
-            summary += f"\n     - {p}"
-
-    summary += f"\n{'=' * 50}"
-    return summary
+        parts.append("   Problemas:")
+        parts.extend(f"     - {p}" for p in metrics.problemas)
+    parts.append(_SEP50)
+    return "\n".join(parts)
+
+
+def _parse_jsonl(raw: bytes) -> Iterator[dict]:
+    """Decodifica as linhas de um trecho JSONL, ignorando as vazias ou inválidas."""
+    for line in raw.split(b"\n"):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if isinstance(data, dict):
+            yield data
+
+
+def iter_quality_log() -> Iterator[dict]:
+    """Percorre o log de qualidade, devolvendo cada entrada como dict.
+
+    O arquivo é lido de uma vez em bytes e dividido por linha; o ``json``
+    decodifica cada linha direto dos bytes. Linhas vazias ou com JSON
+    inválido são ignoradas.
+    """
+    try:
+        raw = LOG_FILE.read_bytes()
+    except FileNotFoundError:
+        return
+    yield from _parse_jsonl(raw)
 
 
 def load_quality_log() -> list[QualityLogEntry]:
     """Carrega todo o log de qualidade para análise."""
-    if not LOG_FILE.exists():
-        return []
-
     entries = []
-    with open(LOG_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try:
-                    data = json.loads(line)
-                    metrics = QualityMetrics(**data.get("metrics", {}))
-                    entry = QualityLogEntry(
-                        timestamp=data["timestamp"],
-                        query=data["query"],
-                        metrics=metrics,
-                        analyst_chars=data.get("analyst_chars", 0),
-                        reviewer_chars=data.get("reviewer_chars", 0),
-                    )
-                    entries.append(entry)
-                except (json.JSONDecodeError, KeyError, TypeError):
-                    continue
+    for data in iter_quality_log():
+        try:
+            metrics = QualityMetrics(**data.get("metrics", {}))
+            entry = QualityLogEntry(
+                timestamp=data["timestamp"],
+                query=data["query"],
+                metrics=metrics,
+                analyst_chars=data.get("analyst_chars", 0),
+                reviewer_chars=data.get("reviewer_chars", 0),
+            )
+            entries.append(entry)
+        except (KeyError, TypeError):
+            continue
     return entries
 
 
+_AGGREGATE_SQL = (
+    "SELECT COUNT(*), AVG(score_fidelidade), MIN(score_fidelidade),"
+    " MAX(score_fidelidade), TOTAL(total_afirmacoes), TOTAL(verificadas_ok),"
+    " TOTAL(sem_fundamentacao), TOTAL(validado)"
+    " FROM quality_log"
+)
+
+
+def _aggregate_jsonl() -> tuple:
+    """Mesmas agregações de ``_AGGREGATE_SQL``, numa passada sobre o JSONL."""
+    count = validated = total_claims = total_ok = total_problems = 0
+    score_sum = 0.0
+    score_min = float("inf")
+    score_max = float("-inf")
+
+    for data in iter_quality_log():
+        if not _is_report_entry(data):
+            continue
+        metrics = data.get("metrics", {})
+        score = metrics.get("score_fidelidade", 0.0)
+        count += 1
+        score_sum += score
+        score_min = min(score_min, score)
+        score_max = max(score_max, score)
+        total_claims += metrics.get("total_afirmacoes", 0)
+        total_ok += metrics.get("verificadas_ok", 0)
+        total_problems += metrics.get("sem_fundamentacao", 0)
+        if metrics.get("validado"):
+            validated += 1
+
+    score_avg = score_sum / count if count else None
+    return count, score_avg, score_min, score_max, total_claims, total_ok, total_problems, validated
+
+
+def _aggregate() -> tuple:
+    """Agrega o log pelo índice SQLite; se ele falhar, direto do JSONL.
+
+    Sem JSONL não há o que indexar, e o índice nem é criado.
+    """
+    if not LOG_FILE.exists():
+        return _aggregate_jsonl()
+    try:
+        conn = _open_quality_db()
+        _sync_quality_index(conn)
+        return conn.execute(_AGGREGATE_SQL).fetchone()
+    except (sqlite3.Error, OSError) as e:
+        print(f"  [AVISO] Índice do log de qualidade indisponível ({e}); lendo o JSONL.")
+    return _aggregate_jsonl()
+
+
 def print_quality_report() -> None:
-    """Imprime um relatório agregado de todas as queries logadas."""
-    entries = load_quality_log()
-    if not entries:
+    """Imprime um relatório agregado de todas as queries logadas.
+
+    As agregações são calculadas pelo SQLite sobre o índice do log, que é
+    antes sincronizado com o JSONL. Respostas servidas do cache de respostas
+    não são logadas e, portanto, não entram no relatório.
+    """
+    count, score_avg, score_min, score_max, total_claims, total_ok, total_problems, validated = (
+        _aggregate()
+    )
+
+    if not count:
         print("Nenhuma entrada no log de qualidade.")
         return
 
-    scores = [e.metrics.score_fidelidade for e in entries]
-    total_claims = sum(e.metrics.total_afirmacoes for e in entries)
-    total_ok = sum(e.metrics.verificadas_ok for e in entries)
-    total_problems = sum(e.metrics.sem_fundamentacao for e in entries)
-
-    print(f"\n{'=' * 60}")
+    print(f"\n{_SEP60}")
     print("📊 RELATÓRIO AGREGADO DE QUALIDADE")
-    print(f"{'=' * 60}")
-    print(f"  Total de queries analisadas: {len(entries)}")
-    print(f"  Score médio de fidelidade:   {sum(scores) / len(scores):.1f}%")
-    print(f"  Score mínimo:                {min(scores):.1f}%")
-    print(f"  Score máximo:                {max(scores):.1f}%")
-    print(f"  Total de afirmações:         {total_claims}")
-    print(f"  Afirmações verificadas OK:   {total_ok}")
-    print(f"  Afirmações sem fundamento:   {total_problems}")
-    validated = sum(1 for e in entries if e.metrics.validado)
-    print(f"  Queries validadas:           {validated}/{len(entries)}")
-    print(f"{'=' * 60}")
+    print(_SEP60)
+    print(f"  Total de queries analisadas: {count}")
+    print(f"  Score médio de fidelidade:   {score_avg:.1f}%")
+    print(f"  Score mínimo:                {score_min:.1f}%")
+    print(f"  Score máximo:                {score_max:.1f}%")
+    print(f"  Total de afirmações:         {int(total_claims)}")
+    print(f"  Afirmações verificadas OK:   {int(total_ok)}")
+    print(f"  Afirmações sem fundamento:   {int(total_problems)}")
+    print(f"  Queries validadas:           {int(validated)}/{count}")
+    print(_SEP60)
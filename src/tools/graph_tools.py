@@ -3,35 +3,202 @@ Tools customizadas do Agno para consultas ao Knowledge Graph Neo4j.
 
 Essas tools são usadas pelo Agente Analista para consultar o grafo
 ANTES de gerar qualquer resumo (integração em tempo de inferência).
+
+As tools são somente leitura e determinísticas para um mesmo estado do
+grafo, então seus resultados ficam em cache no processo por até
+``GRAPH_CACHE_TTL`` segundos. ``invalidate_graph_cache`` (chamada pela
+ingestão) os descarta também nos outros processos da mesma máquina, via
+o arquivo ``.cache/graph_version``. O grafo completo, consultado pelo
+Revisor a cada pergunta, fica fora desse cache: é salvo em disco
+(``.cache/``) e reaproveitado entre execuções pelo mesmo TTL.
 """
 
 from __future__ import annotations
 
+import atexit
+import hashlib
 import json
 import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from pathlib import Path
+
+from neo4j import Driver, GraphDatabase
+from neo4j.exceptions import ServiceUnavailable
+
+from src.paths import CACHE_DIR
 
-from neo4j import GraphDatabase
+# Validade dos resultados das tools em memória; o arquivo de versão é tocado
+# a cada reingestão e invalida os caches de todos os processos
+GRAPH_CACHE_TTL = 300  # segundos
+GRAPH_VERSION_FILE = CACHE_DIR / "graph_version"
 
+# Snapshot em disco de obter_dados_grafo_completo, um por instância Neo4j
+# (removido na reingestão). Guarda os textos dos votos, por isso fica no
+# .cache/ (fora do git), e vale o mesmo TTL dos caches em memória: mudanças
+# no grafo feitas fora desta máquina aparecem para o Revisor em até 5 min.
+GRAPH_SNAPSHOT_DIR = CACHE_DIR
+GRAPH_SNAPSHOT_TTL = GRAPH_CACHE_TTL
 
-def _get_driver():
-    """Cria um driver Neo4j a partir das variáveis de ambiente."""
+
+def _graph_generation() -> int:
+    """Versão local do grafo: mtime do arquivo tocado na última reingestão."""
+    try:
+        return GRAPH_VERSION_FILE.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _graph_memo(maxsize: int):
+    """Memoiza uma tool por argumentos, como ``lru_cache``, com expiração.
+
+    Uma entrada vale por ``GRAPH_CACHE_TTL`` segundos e só enquanto a versão
+    do grafo (``_graph_generation``) não mudar. Thread-safe.
+    """
+    def decorator(func):
+        cache: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            generation = _graph_generation()
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(key)
+                if hit is not None and hit[0] == generation and hit[1] > now:
+                    cache.move_to_end(key)
+                    return hit[2]
+
+            value = func(*args, **kwargs)
+            with lock:
+                cache[key] = (generation, now + GRAPH_CACHE_TTL, value)
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return value
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=1)
+def _get_driver() -> Driver:
+    """Driver Neo4j compartilhado pelo processo (criado na primeira query).
+
+    O driver mantém o pool de conexões e é thread-safe; recriá-lo a cada
+    query descartava o pool e pagava conexão e autenticação toda vez.
+    """
     uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     user = os.getenv("NEO4J_USERNAME", "neo4j")
     password = os.getenv("NEO4J_PASSWORD", "stf_password_2026")
-    return GraphDatabase.driver(uri, auth=(user, password))
+    driver = GraphDatabase.driver(uri, auth=(user, password), max_connection_pool_size=20)
+    atexit.register(driver.close)
+    return driver
+
+
+def invalidate_graph_cache() -> None:
+    """Descarta os resultados em cache das tools (chamar após reconstruir o KG).
+
+    Também toca ``GRAPH_VERSION_FILE``, o que invalida os caches de outros
+    processos (ex.: uma sessão de chat já aberta).
+    """
+    for tool in (
+        buscar_decisao,
+        listar_todas_decisoes,
+        buscar_por_tema,
+        buscar_por_artigo,
+        buscar_conexoes_multihop,
+    ):
+        tool.cache_clear()
+    for snapshot in GRAPH_SNAPSHOT_DIR.glob("graph_snapshot*.json"):
+        snapshot.unlink(missing_ok=True)
+    GRAPH_VERSION_FILE.parent.mkdir(exist_ok=True)
+    GRAPH_VERSION_FILE.touch()
+
+
+def _snapshot_path() -> Path:
+    """Snapshot da instância em NEO4J_URI (outro banco não reaproveita o arquivo)."""
+    uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+    digest = hashlib.sha256(uri.encode("utf-8")).hexdigest()[:12]
+    return GRAPH_SNAPSHOT_DIR / f"graph_snapshot_{digest}.json"
+
+
+def _snapshot_fresh(path: Path) -> bool:
+    """Indica se o snapshot existe, é mais novo que o TTL e que a última reingestão."""
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    if st.st_mtime_ns < _graph_generation():
+        return False
+    return time.time() - st.st_mtime < GRAPH_SNAPSHOT_TTL
+
+
+def _write_snapshot(path: Path, content: str) -> None:
+    """Grava o snapshot de forma atômica; falhas de disco são ignoradas."""
+    try:
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        Path(tmp_path).unlink(missing_ok=True)
 
 
 def _run_query(query: str, params: dict | None = None) -> list[dict]:
     """Executa query Cypher e retorna resultados."""
-    driver = _get_driver()
-    try:
-        with driver.session() as session:
-            result = session.run(query, params or {})
-            return [record.data() for record in result]
-    finally:
-        driver.close()
+    with _get_driver().session() as session:
+        return session.run(query, params or {}).data()
 
 
+def _run_query_rows(query: str, params: dict | None = None) -> list[dict]:
+    """Como ``_run_query``, mas monta os dicts direto das tuplas de valores.
+
+    Para consultas que retornam só valores simples (strings, números,
+    listas, mapas), evita a conversão recursiva de ``Record.data()`` em
+    resultados grandes.
+    """
+    with _get_driver().session() as session:
+        result = session.run(query, params or {})
+        keys = result.keys()
+        return [dict(zip(keys, values)) for values in result.values()]
+
+
+_Q_BUSCAR_DECISAO = """
+MATCH (p:Processo_STF {numero: $numero})
+OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
+OPTIONAL MATCH (p)-[:TRATA_DE]->(t:Tema_Repercussao_Geral)
+OPTIONAL MATCH (p)-[:CITA_ARTIGO]->(a:Artigo_Constitucional)
+OPTIONAL MATCH (p)-[:CITA_PRECEDENTE]->(prec:Processo_STF)
+RETURN p.numero AS processo,
+       p.classe AS classe,
+       p.data_julgamento AS data_julgamento,
+       p.voto_texto AS voto,
+       p.dispositivo_texto AS dispositivo,
+       m.nome AS ministro_relator,
+       [x IN collect(DISTINCT {numero: t.numero, descricao: t.descricao})
+        WHERE x.numero IS NOT NULL] AS temas,
+       [x IN collect(DISTINCT {artigo: a.artigo, descricao: a.descricao})
+        WHERE x.artigo IS NOT NULL] AS artigos,
+       collect(DISTINCT prec.numero) AS precedentes_citados
+"""
+
+
+@_graph_memo(maxsize=256)
 def buscar_decisao(numero_processo: str) -> str:
     """Busca uma decisão do STF pelo número do processo no Knowledge Graph.
 
@@ -42,23 +209,7 @@ def buscar_decisao(numero_processo: str) -> str:
         JSON com dados da decisão: processo, ministro relator, temas, artigos citados,
         voto e dispositivo.
     """
-    query = """
-    MATCH (p:Processo_STF {numero: $numero})
-    OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
-    OPTIONAL MATCH (p)-[:TRATA_DE]->(t:Tema_Repercussao_Geral)
-    OPTIONAL MATCH (p)-[:CITA_ARTIGO]->(a:Artigo_Constitucional)
-    OPTIONAL MATCH (p)-[:CITA_PRECEDENTE]->(prec:Processo_STF)
-    RETURN p.numero AS processo,
-           p.classe AS classe,
-           p.data_julgamento AS data_julgamento,
-           p.voto_texto AS voto,
-           p.dispositivo_texto AS dispositivo,
-           m.nome AS ministro_relator,
-           collect(DISTINCT {numero: t.numero, descricao: t.descricao}) AS temas,
-           collect(DISTINCT {artigo: a.artigo, descricao: a.descricao}) AS artigos,
-           collect(DISTINCT prec.numero) AS precedentes_citados
-    """
-    results = _run_query(query, {"numero": numero_processo})
+    results = _run_query(_Q_BUSCAR_DECISAO, {"numero": numero_processo})
 
     if not results or results[0].get("processo") is None:
         return json.dumps(
@@ -66,34 +217,45 @@ def buscar_decisao(numero_processo: str) -> str:
             ensure_ascii=False,
         )
 
-    row = results[0]
-    # Remove nulos de collect
-    row["temas"] = [t for t in row.get("temas", []) if t.get("numero") is not None]
-    row["artigos"] = [a for a in row.get("artigos", []) if a.get("artigo") is not None]
-    row["precedentes_citados"] = [p for p in row.get("precedentes_citados", []) if p is not None]
+    return json.dumps(results[0], ensure_ascii=False, default=str)
 
-    return json.dumps(row, ensure_ascii=False, default=str)
+
+_Q_LISTAR_DECISOES = """
+MATCH (p:Processo_STF)
+OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
+RETURN p.numero AS processo,
+       p.classe AS classe,
+       m.nome AS ministro_relator,
+       p.data_julgamento AS data_julgamento
+ORDER BY p.data_julgamento
+"""
 
 
+@_graph_memo(maxsize=1)
 def listar_todas_decisoes() -> str:
     """Lista todas as decisões do STF presentes no Knowledge Graph.
 
     Returns:
         JSON com lista resumida de todas as decisões: número, classe, ministro relator e data.
     """
-    query = """
-    MATCH (p:Processo_STF)
-    OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
-    RETURN p.numero AS processo,
-           p.classe AS classe,
-           m.nome AS ministro_relator,
-           p.data_julgamento AS data_julgamento
-    ORDER BY p.data_julgamento
-    """
-    results = _run_query(query)
+    results = _run_query_rows(_Q_LISTAR_DECISOES)
     return json.dumps(results, ensure_ascii=False, default=str)
 
 
+_Q_BUSCAR_POR_TEMA = """
+MATCH (p:Processo_STF)-[:TRATA_DE]->(t:Tema_Repercussao_Geral)
+WHERE t.descricao_lower CONTAINS $termo
+OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
+RETURN p.numero AS processo,
+       p.classe AS classe,
+       m.nome AS ministro_relator,
+       t.numero AS tema_numero,
+       t.descricao AS tema_descricao,
+       p.dispositivo_texto AS dispositivo
+"""
+
+
+@_graph_memo(maxsize=256)
 def buscar_por_tema(descricao_tema: str) -> str:
     """Busca decisões do STF relacionadas a um tema de repercussão geral.
 
@@ -103,18 +265,7 @@ def buscar_por_tema(descricao_tema: str) -> str:
     Returns:
         JSON com decisões que tratam do tema encontrado.
     """
-    query = """
-    MATCH (p:Processo_STF)-[:TRATA_DE]->(t:Tema_Repercussao_Geral)
-    WHERE toLower(t.descricao) CONTAINS toLower($termo)
-    OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
-    RETURN p.numero AS processo,
-           p.classe AS classe,
-           m.nome AS ministro_relator,
-           t.numero AS tema_numero,
-           t.descricao AS tema_descricao,
-           p.dispositivo_texto AS dispositivo
-    """
-    results = _run_query(query, {"termo": descricao_tema})
+    results = _run_query(_Q_BUSCAR_POR_TEMA, {"termo": descricao_tema.lower()})
 
     if not results:
         return json.dumps(
@@ -125,6 +276,20 @@ def buscar_por_tema(descricao_tema: str) -> str:
     return json.dumps(results, ensure_ascii=False, default=str)
 
 
+_Q_BUSCAR_POR_ARTIGO = """
+MATCH (p:Processo_STF)-[:CITA_ARTIGO]->(a:Artigo_Constitucional)
+WHERE a.artigo_lower CONTAINS $artigo
+OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
+RETURN p.numero AS processo,
+       p.classe AS classe,
+       m.nome AS ministro_relator,
+       a.artigo AS artigo_citado,
+       a.descricao AS artigo_descricao,
+       p.dispositivo_texto AS dispositivo
+"""
+
+
+@_graph_memo(maxsize=256)
 def buscar_por_artigo(artigo: str) -> str:
     """Busca decisões do STF que citam um artigo da Constituição Federal.
 
@@ -135,18 +300,7 @@ def buscar_por_artigo(artigo: str) -> str:
     Returns:
         JSON com decisões que citam o artigo.
     """
-    query = """
-    MATCH (p:Processo_STF)-[:CITA_ARTIGO]->(a:Artigo_Constitucional)
-    WHERE toLower(a.artigo) CONTAINS toLower($artigo)
-    OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
-    RETURN p.numero AS processo,
-           p.classe AS classe,
-           m.nome AS ministro_relator,
-           a.artigo AS artigo_citado,
-           a.descricao AS artigo_descricao,
-           p.dispositivo_texto AS dispositivo
-    """
-    results = _run_query(query, {"artigo": artigo})
+    results = _run_query(_Q_BUSCAR_POR_ARTIGO, {"artigo": artigo.lower()})
 
     if not results:
         return json.dumps(
@@ -157,6 +311,57 @@ def buscar_por_artigo(artigo: str) -> str:
     return json.dumps(results, ensure_ascii=False, default=str)
 
 
+# Todas as conexões numa única query: cada CALL agrega uma categoria e
+# sempre devolve uma linha (lista vazia se não houver conexões).
+_Q_CONEXOES_MULTIHOP = """
+MATCH (p1:Processo_STF {numero: $numero})
+CALL {
+    // 1. Processos que citam o mesmo precedente
+    WITH p1
+    MATCH (p1)-[:CITA_PRECEDENTE]->(prec:Processo_STF)<-[:CITA_PRECEDENTE]-(p2:Processo_STF)
+    WHERE p1 <> p2
+    RETURN collect({processo: p2.numero, precedente_comum: prec.numero}) AS mesmo_precedente
+}
+CALL {
+    // 2. Processos que tratam do mesmo tema
+    WITH p1
+    MATCH (p1)-[:TRATA_DE]->(t:Tema_Repercussao_Geral)<-[:TRATA_DE]-(p2:Processo_STF)
+    WHERE p1 <> p2
+    RETURN collect({processo: p2.numero, tema_comum: t.descricao}) AS mesmo_tema
+}
+CALL {
+    // 3. Processos que citam os mesmos artigos constitucionais
+    WITH p1
+    MATCH (p1)-[:CITA_ARTIGO]->(a:Artigo_Constitucional)<-[:CITA_ARTIGO]-(p2:Processo_STF)
+    WHERE p1 <> p2
+    WITH p2, collect(DISTINCT a.artigo) AS artigos_comuns
+    RETURN collect({processo: p2.numero, artigos_comuns: artigos_comuns}) AS mesmo_artigo
+}
+CALL {
+    // 4. Processos relatados pelo mesmo ministro
+    WITH p1
+    MATCH (p1)-[:RELATADO_POR]->(m:Ministro_Relator)<-[:RELATADO_POR]-(p2:Processo_STF)
+    WHERE p1 <> p2
+    RETURN collect({processo: p2.numero, relator_comum: m.nome}) AS mesmo_relator
+}
+CALL {
+    // 5. Cadeia de precedentes (2 hops)
+    WITH p1
+    MATCH (p1)-[:CITA_PRECEDENTE]->(p2:Processo_STF)-[:CITA_PRECEDENTE]->(p3:Processo_STF)
+    RETURN collect({intermediario: p2.numero, precedente_indireto: p3.numero}) AS cadeia_precedentes
+}
+CALL {
+    // 6. Processos que citam ESTE processo como precedente
+    WITH p1
+    MATCH (p2:Processo_STF)-[:CITA_PRECEDENTE]->(p1)
+    RETURN collect({processo_que_cita: p2.numero}) AS citado_por
+}
+RETURN mesmo_precedente, mesmo_tema, mesmo_artigo, mesmo_relator,
+       cadeia_precedentes, citado_por
+"""
+
+
+@_graph_memo(maxsize=256)
 def buscar_conexoes_multihop(numero_processo: str) -> str:
     """Identifica conexões multi-hop entre decisões do STF no Knowledge Graph.
 
@@ -173,6 +378,8 @@ def buscar_conexoes_multihop(numero_processo: str) -> str:
     Returns:
         JSON com todas as conexões encontradas, organizadas por tipo.
     """
+    results = _run_query(_Q_CONEXOES_MULTIHOP, {"numero": numero_processo})
+
     conexoes: dict = {
         "processo_origem": numero_processo,
         "mesmo_precedente": [],
@@ -180,61 +387,33 @@ def buscar_conexoes_multihop(numero_processo: str) -> str:
         "mesmo_artigo": [],
         "mesmo_relator": [],
         "cadeia_precedentes": [],
+        "citado_por": [],
     }
+    # Sem linha de resultado = processo não está no grafo
+    if results:
+        conexoes.update(results[0])
 
-    # 1. Processos que citam o mesmo precedente
-    q1 = """
-    MATCH (p1:Processo_STF {numero: $numero})-[:CITA_PRECEDENTE]->(prec:Processo_STF)<-[:CITA_PRECEDENTE]-(p2:Processo_STF)
-    WHERE p1 <> p2
-    RETURN p2.numero AS processo, prec.numero AS precedente_comum
-    """
-    r1 = _run_query(q1, {"numero": numero_processo})
-    conexoes["mesmo_precedente"] = r1
-
-    # 2. Processos que tratam do mesmo tema
-    q2 = """
-    MATCH (p1:Processo_STF {numero: $numero})-[:TRATA_DE]->(t:Tema_Repercussao_Geral)<-[:TRATA_DE]-(p2:Processo_STF)
-    WHERE p1 <> p2
-    RETURN p2.numero AS processo, t.descricao AS tema_comum
-    """
-    r2 = _run_query(q2, {"numero": numero_processo})
-    conexoes["mesmo_tema"] = r2
-
-    # 3. Processos que citam os mesmos artigos constitucionais
-    q3 = """
-    MATCH (p1:Processo_STF {numero: $numero})-[:CITA_ARTIGO]->(a:Artigo_Constitucional)<-[:CITA_ARTIGO]-(p2:Processo_STF)
-    WHERE p1 <> p2
-    RETURN DISTINCT p2.numero AS processo, collect(DISTINCT a.artigo) AS artigos_comuns
-    """
-    r3 = _run_query(q3, {"numero": numero_processo})
-    conexoes["mesmo_artigo"] = r3
-
-    # 4. Processos relatados pelo mesmo ministro
-    q4 = """
-    MATCH (p1:Processo_STF {numero: $numero})-[:RELATADO_POR]->(m:Ministro_Relator)<-[:RELATADO_POR]-(p2:Processo_STF)
-    WHERE p1 <> p2
-    RETURN p2.numero AS processo, m.nome AS relator_comum
-    """
-    r4 = _run_query(q4, {"numero": numero_processo})
-    conexoes["mesmo_relator"] = r4
-
-    # 5. Cadeia de precedentes (2 hops)
-    q5 = """
-    MATCH (p1:Processo_STF {numero: $numero})-[:CITA_PRECEDENTE]->(p2:Processo_STF)-[:CITA_PRECEDENTE]->(p3:Processo_STF)
-    RETURN p2.numero AS intermediario, p3.numero AS precedente_indireto
-    """
-    r5 = _run_query(q5, {"numero": numero_processo})
-    conexoes["cadeia_precedentes"] = r5
+    return json.dumps(conexoes, ensure_ascii=False, default=str)
 
-    # 6. Processos que citam ESTE processo como precedente
-    q6 = """
-    MATCH (p2:Processo_STF)-[:CITA_PRECEDENTE]->(p1:Processo_STF {numero: $numero})
-    RETURN p2.numero AS processo_que_cita
-    """
-    r6 = _run_query(q6, {"numero": numero_processo})
-    conexoes["citado_por"] = r6
 
-    return json.dumps(conexoes, ensure_ascii=False, default=str)
+_Q_GRAFO_COMPLETO = """
+MATCH (p:Processo_STF)
+OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
+OPTIONAL MATCH (p)-[:TRATA_DE]->(t:Tema_Repercussao_Geral)
+OPTIONAL MATCH (p)-[:CITA_ARTIGO]->(a:Artigo_Constitucional)
+OPTIONAL MATCH (p)-[:CITA_PRECEDENTE]->(prec:Processo_STF)
+RETURN p.numero AS processo,
+       p.classe AS classe,
+       p.data_julgamento AS data_julgamento,
+       p.voto_texto AS voto,
+       p.dispositivo_texto AS dispositivo,
+       m.nome AS ministro_relator,
+       [x IN collect(DISTINCT {numero: t.numero, descricao: t.descricao})
+        WHERE x.numero IS NOT NULL] AS temas,
+       collect(DISTINCT a.artigo) AS artigos_citados,
+       collect(DISTINCT prec.numero) AS precedentes_citados
+ORDER BY p.data_julgamento
+"""
 
 
 def obter_dados_grafo_completo() -> str:
@@ -245,29 +424,50 @@ def obter_dados_grafo_completo() -> str:
     Returns:
         JSON com todos os nós e relações do grafo.
     """
-    query = """
-    MATCH (p:Processo_STF)
-    OPTIONAL MATCH (p)-[:RELATADO_POR]->(m:Ministro_Relator)
-    OPTIONAL MATCH (p)-[:TRATA_DE]->(t:Tema_Repercussao_Geral)
-    OPTIONAL MATCH (p)-[:CITA_ARTIGO]->(a:Artigo_Constitucional)
-    OPTIONAL MATCH (p)-[:CITA_PRECEDENTE]->(prec:Processo_STF)
-    RETURN p.numero AS processo,
-           p.classe AS classe,
-           p.data_julgamento AS data_julgamento,
-           p.voto_texto AS voto,
-           p.dispositivo_texto AS dispositivo,
-           m.nome AS ministro_relator,
-           collect(DISTINCT {numero: t.numero, descricao: t.descricao}) AS temas,
-           collect(DISTINCT a.artigo) AS artigos_citados,
-           collect(DISTINCT prec.numero) AS precedentes_citados
-    ORDER BY p.data_julgamento
+    snapshot = _snapshot_path()
+    if _snapshot_fresh(snapshot):
+        try:
+            return snapshot.read_text(encoding="utf-8")
+        except OSError:
+            pass
+
+    results = _run_query_rows(_Q_GRAFO_COMPLETO)
+    content = json.dumps(results, ensure_ascii=False, default=str)
+    _write_snapshot(snapshot, content)
+    return content
+
+
+# (tool, query, parâmetros fictícios): EXPLAIN só planeja, mas exige todos os parâmetros
+_WARMUP_QUERIES = (
+    ("buscar_decisao", _Q_BUSCAR_DECISAO, {"numero": ""}),
+    ("listar_todas_decisoes", _Q_LISTAR_DECISOES, {}),
+    ("buscar_por_tema", _Q_BUSCAR_POR_TEMA, {"termo": ""}),
+    ("buscar_por_artigo", _Q_BUSCAR_POR_ARTIGO, {"artigo": ""}),
+    ("buscar_conexoes_multihop", _Q_CONEXOES_MULTIHOP, {"numero": ""}),
+    ("obter_dados_grafo_completo", _Q_GRAFO_COMPLETO, {}),
+)
+
+
+def warmup_plan_cache() -> None:
+    """Planeja antecipadamente as queries das tools no Neo4j (via EXPLAIN).
+
+    Como o texto de cada query é uma constante, o plano fica no cache do
+    servidor e a primeira chamada real de cada tool não paga o planejamento.
+    É só uma otimização: cada query é planejada separadamente e uma falha
+    vira um aviso, sem impedir as demais.
     """
-    results = _run_query(query)
-
-    # Limpa nulos dos collects
-    for row in results:
-        row["temas"] = [t for t in row.get("temas", []) if t.get("numero") is not None]
-        row["artigos_citados"] = [a for a in row.get("artigos_citados", []) if a is not None]
-        row["precedentes_citados"] = [p for p in row.get("precedentes_citados", []) if p is not None]
-
-    return json.dumps(results, ensure_ascii=False, default=str)
+    try:
+        driver = _get_driver()
+    except Exception as e:
+        print(f"  [AVISO] Neo4j indisponível para pré-planejar as queries: {e}")
+        return
+
+    with driver.session() as session:
+        for tool_name, query, params in _WARMUP_QUERIES:
+            try:
+                session.run("EXPLAIN " + query, params).consume()
+            except ServiceUnavailable as e:
+                print(f"  [AVISO] Neo4j indisponível para pré-planejar as queries: {e}")
+                return
+            except Exception as e:
+                print(f"  [AVISO] Falha ao pré-planejar a query de {tool_name}: {e}")